@@ -3,6 +3,7 @@ Configuration for Momentum Trading Agent
 """
 import os
 import json
+import functools
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -70,8 +71,13 @@ CAP_CONFIG = {
 }
 
 
+@functools.lru_cache(maxsize=8)
 def get_cap_config(cap: str) -> dict:
-    """Get configuration for a specific market cap category"""
+    """
+    Get configuration for a specific market cap category.
+
+    Memoized - CAP_CONFIG is static, so callers must treat the result as read-only.
+    """
     if cap and cap in CAP_CONFIG:
         return CAP_CONFIG[cap]
     # Return defaults if no cap specified
@@ -1,12 +1,38 @@
 """
 Database Module - SQLite for trade history, DQL training data, and performance metrics
 """
+import os
 import sqlite3
 import json
+import queue
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 from config import DB_PATH
 
+# SQLite tuning applied to every pooled connection
+SQLITE_BUSY_TIMEOUT_MS = 30000
+SQLITE_CACHE_SIZE_KB = 64000
+SQLITE_STATEMENT_CACHE = 256
+POOL_READERS = 4
+
+# Monitor indicator values stored per position check (name, SQL type);
+# names match the keys of monitor.calculate_reversal_signals()["details"]
+POSITION_CHECK_INDICATOR_COLUMNS = [
+    ("sma_7", "REAL"),
+    ("sma_20", "REAL"),
+    ("close_position", "REAL"),
+    ("volume_ratio", "REAL"),
+    ("is_red_day", "INTEGER"),
+    ("rsi", "REAL"),
+    ("rsi_prev", "REAL"),
+    ("high_5d", "REAL"),
+]
+
+# Scan locks older than this are treated as abandoned
+SCAN_LOCK_STALE_MINUTES = 60
+
 
 def get_connection() -> sqlite3.Connection:
     """Get database connection, creating tables if needed"""
@@ -18,6 +44,101 @@ def get_connection() -> sqlite3.Connection:
     return conn
 
 
+def init_conn(conn: sqlite3.Connection):
+    """Apply WAL journaling and connection PRAGMAs to a new connection"""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+
+
+class ConnectionPool:
+    """
+    Process-wide SQLite connection pool: one dedicated writer + N readers.
+
+    Connections are opened lazily, initialized once via init_conn(), and
+    reused across calls instead of being opened/closed per job.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, readers: int = POOL_READERS):
+        self.db_path = db_path
+        self.max_readers = readers
+        self._readers = queue.Queue()
+        self._reader_count = 0
+        self._writer = None
+        self._lock = threading.Lock()
+        self._writer_lock = threading.RLock()
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=SQLITE_STATEMENT_CACHE,
+        )
+        conn.row_factory = sqlite3.Row
+        init_conn(conn)
+        with self._lock:
+            if not self._schema_ready:
+                init_tables(conn)
+                migrate_tables(conn)
+                self._schema_ready = True
+        return conn
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._reader_count < self.max_readers
+            if can_open:
+                self._reader_count += 1
+
+        if can_open:
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._reader_count -= 1
+                raise
+
+        return self._readers.get()
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a pooled connection; commits on success, rolls back on error"""
+        conn = self._acquire_reader()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._readers.put(conn)
+
+    @contextmanager
+    def writer(self):
+        """Borrow the dedicated write connection (serialized across threads)"""
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = self._connect()
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+
+pool = ConnectionPool()
+
+
 def migrate_tables(conn: sqlite3.Connection):
     """Add missing columns to existing tables"""
     cursor = conn.cursor()
@@ -97,6 +218,19 @@ def migrate_tables(conn: sqlite3.Connection):
                 if "duplicate column" not in str(e).lower():
                     print(f"Error adding column {col_name}: {e}")
 
+    # Migrate position_checks table for monitor indicator columns
+    cursor.execute("PRAGMA table_info(position_checks)")
+    position_check_columns = {row[1] for row in cursor.fetchall()}
+
+    for col_name, col_type in POSITION_CHECK_INDICATOR_COLUMNS:
+        if col_name not in position_check_columns:
+            try:
+                cursor.execute(f"ALTER TABLE position_checks ADD COLUMN {col_name} {col_type}")
+                print(f"Added column {col_name} to position_checks table")
+            except sqlite3.OperationalError as e:
+                if "duplicate column" not in str(e).lower():
+                    print(f"Error adding column {col_name}: {e}")
+
     conn.commit()
 
 
@@ -289,6 +423,14 @@ def init_tables(conn: sqlite3.Connection):
             signals TEXT,  -- JSON
             pnl_pct REAL,
             alert_sent INTEGER DEFAULT 0,
+            sma_7 REAL,
+            sma_20 REAL,
+            close_position REAL,
+            volume_ratio REAL,
+            is_red_day INTEGER,
+            rsi REAL,
+            rsi_prev REAL,
+            high_5d REAL,
             created_at TEXT DEFAULT CURRENT_TIMESTAMP
         )
     """)
@@ -423,6 +565,15 @@ def init_tables(conn: sqlite3.Connection):
         )
     """)
 
+    # Advisory lock row preventing concurrent autonomous scans (single row, id=1)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scan_lock (
+            id INTEGER PRIMARY KEY,
+            pid INTEGER,
+            started TEXT
+        )
+    """)
+
     # Flow signals table (options flow from Unusual Whales)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS flow_signals (
@@ -569,6 +720,14 @@ def init_tables(conn: sqlite3.Connection):
         )
     """)
 
+    # Covering index for daily trade counts (daily_snapshot)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_trades_dates ON trades(entry_date, exit_date, status)")
+
+    # Timestamp indexes for range deletes in cleanup_old_data
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cand_snap_ts ON candidate_snapshots(timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_market_snap_ts ON market_snapshots(timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_position_checks_time ON position_checks(check_time)")
+
     # Indexes for signal outcome analysis
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_outcomes_score ON flow_signal_outcomes(signal_score)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_outcomes_winner ON flow_signal_outcomes(was_winner)")
@@ -851,13 +1010,47 @@ def update_trade_reward(trade_id: int):
     conn.close()
 
 
+def update_missing_trade_rewards() -> int:
+    """
+    Fill in rewards for all closed trades that don't have one yet.
+
+    Loads the candidate rows in one SELECT and writes every reward with a
+    single executemany/commit, reusing calculate_reward() as the formula.
+
+    Returns number of trades updated.
+    """
+    with pool.writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT * FROM trades
+            WHERE status = 'closed' AND reward IS NULL
+        """)
+
+        rows = []
+        for row in cursor.fetchall():
+            reward = calculate_reward(dict(row))
+            if reward is not None:
+                rows.append((reward, row['id']))
+
+        cursor.executemany("UPDATE trades SET reward = ? WHERE id = ?", rows)
+
+    return len(rows)
+
+
 # ============== DAILY PERFORMANCE FUNCTIONS ==============
 
 def log_daily_performance(date: str, starting_equity: float, ending_equity: float,
                           trades_opened: int, trades_closed: int, win_count: int,
                           loss_count: int, positions_held: int, cash_pct: float,
                           spy_change: float = None):
-    """Log daily performance snapshot"""
+    """
+    Log daily performance snapshot.
+
+    Idempotent per date: repeat runs on the same day upsert the row,
+    keeping the first run's starting_equity and refreshing everything else.
+    """
     conn = get_connection()
     cursor = conn.cursor()
 
@@ -865,11 +1058,25 @@ def log_daily_performance(date: str, starting_equity: float, ending_equity: floa
     daily_pnl_pct = (daily_pnl / starting_equity * 100) if starting_equity > 0 else 0
 
     cursor.execute("""
-        INSERT OR REPLACE INTO daily_performance (
+        INSERT INTO daily_performance (
             date, starting_equity, ending_equity, daily_pnl, daily_pnl_pct,
             trades_opened, trades_closed, win_count, loss_count,
             positions_held, cash_pct, spy_change
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            ending_equity = excluded.ending_equity,
+            daily_pnl = excluded.ending_equity - daily_performance.starting_equity,
+            daily_pnl_pct = CASE WHEN daily_performance.starting_equity > 0
+                THEN (excluded.ending_equity - daily_performance.starting_equity)
+                     / daily_performance.starting_equity * 100
+                ELSE 0 END,
+            trades_opened = excluded.trades_opened,
+            trades_closed = excluded.trades_closed,
+            win_count = excluded.win_count,
+            loss_count = excluded.loss_count,
+            positions_held = excluded.positions_held,
+            cash_pct = excluded.cash_pct,
+            spy_change = excluded.spy_change
     """, (
         date, starting_equity, ending_equity, daily_pnl, daily_pnl_pct,
         trades_opened, trades_closed, win_count, loss_count,
@@ -1391,6 +1598,16 @@ def get_trade_by_symbol(symbol: str, status: str = "open") -> dict:
     return dict(row) if row else None
 
 
+def get_open_trades_by_symbol() -> dict[str, dict]:
+    """Get the most recent open trade for every symbol, keyed by symbol"""
+    with pool.checkout() as conn:
+        # Ascending order so the newest trade per symbol wins the dict build,
+        # matching get_trade_by_symbol's ORDER BY created_at DESC LIMIT 1
+        rows = conn.execute("SELECT * FROM trades WHERE status = 'open' ORDER BY created_at ASC").fetchall()
+
+    return {row["symbol"]: dict(row) for row in rows}
+
+
 def get_watchlist() -> list[dict]:
     """Get current watchlist"""
     conn = get_connection()
@@ -1506,6 +1723,41 @@ def update_position_tracking(symbol: str, current_price: float, entry_price: flo
     conn.close()
 
 
+def update_position_tracking_batch(positions: list[dict]) -> int:
+    """
+    Update max gain/drawdown tracking for many open positions in one transaction.
+
+    Args:
+        positions: Dicts with symbol, current_price and avg_entry_price (executor.get_positions format)
+
+    Returns number of open trades updated.
+    """
+    rows = [
+        {
+            "symbol": p['symbol'],
+            "pnl_pct": (p['current_price'] - p['avg_entry_price']) / p['avg_entry_price'] * 100,
+        }
+        for p in positions
+        if p.get('avg_entry_price')
+    ]
+    if not rows:
+        return 0
+
+    with pool.writer() as conn:
+        cursor = conn.executemany("""
+            UPDATE trades SET
+                max_gain_during_trade = MAX(COALESCE(max_gain_during_trade, 0), :pnl_pct),
+                max_drawdown_during_trade = MIN(COALESCE(max_drawdown_during_trade, 0), :pnl_pct)
+            WHERE id = (
+                SELECT id FROM trades WHERE symbol = :symbol AND status = 'open'
+                ORDER BY created_at DESC LIMIT 1
+            )
+        """, rows)
+
+    # executemany's rowcount sums the rows each statement changed
+    return cursor.rowcount
+
+
 # ============== POOR SIGNALS FUNCTIONS ==============
 
 def log_poor_signal(trade: dict, reversal_score: int, reversal_signals: list, notes: str = None):
@@ -1875,6 +2127,54 @@ def get_recent_scan_decisions(limit: int = 10) -> list:
     return decisions
 
 
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process with this pid exists on this host"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def acquire_scan_lock(pid: int) -> bool:
+    """
+    Try to take the scan lock row. Returns True if acquired.
+
+    Runs under BEGIN IMMEDIATE so the check-and-insert is atomic across
+    processes. A lock whose owner pid is gone, or which is older than
+    SCAN_LOCK_STALE_MINUTES, is taken over.
+    """
+    with pool.writer() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT pid, started FROM scan_lock WHERE id = 1").fetchone()
+
+        if row:
+            try:
+                age = datetime.now() - datetime.fromisoformat(row['started'])
+                expired = age > timedelta(minutes=SCAN_LOCK_STALE_MINUTES)
+            except (TypeError, ValueError):
+                expired = True
+
+            if _pid_alive(row['pid']) and not expired:
+                conn.rollback()
+                return False
+
+        conn.execute(
+            "INSERT OR REPLACE INTO scan_lock (id, pid, started) VALUES (1, ?, ?)",
+            (pid, datetime.now().isoformat())
+        )
+
+    return True
+
+
+def release_scan_lock(pid: int):
+    """Release the scan lock row if held by this pid"""
+    with pool.writer() as conn:
+        conn.execute("DELETE FROM scan_lock WHERE id = 1 AND pid = ?", (pid,))
+
+
 # ============== DQN EXPERIENCE BACKFILL FUNCTIONS ==============
 
 def backfill_dqn_experiences():
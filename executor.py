@@ -1,6 +1,7 @@
 """
 Executor Module - Places and manages orders via Alpaca
 """
+import functools
 from datetime import datetime
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import (
@@ -58,20 +59,33 @@ def calculate_position_size(account_equity: float, price: float) -> int:
     return max(1, shares)  # At least 1 share
 
 
+@functools.lru_cache(maxsize=1)
+def load_symbol_caps() -> dict:
+    """
+    Map every symbol in data/universe.json to its market cap category.
+
+    Loaded once; call load_symbol_caps.cache_clear() after the universe
+    file changes. Raises if the file can't be read, so a failure is retried
+    on the next call instead of being memoized.
+    """
+    import json
+    with open("data/universe.json", "r") as f:
+        data = json.load(f)
+    caps = {}
+    symbols = data.get("symbols", {})
+    if isinstance(symbols, dict):
+        for cap, cap_symbols in symbols.items():
+            for symbol in cap_symbols:
+                caps.setdefault(symbol, cap)
+    return caps
+
+
 def get_symbol_cap(symbol: str) -> str:
     """Get the market cap category for a symbol"""
-    import json
     try:
-        with open("data/universe.json", "r") as f:
-            data = json.load(f)
-        symbols = data.get("symbols", {})
-        if isinstance(symbols, dict):
-            for cap, cap_symbols in symbols.items():
-                if symbol in cap_symbols:
-                    return cap
+        return load_symbol_caps().get(symbol)
     except Exception:
-        pass
-    return None
+        return None
 
 
 def place_entry_order(symbol: str, signals: dict, cap: str = None) -> dict:
@@ -1,6 +1,8 @@
 """
 Flow Scanner - Fetch and score unusual options flow from Unusual Whales API
 """
+import heapq
+import operator
 import os
 import requests
 from datetime import datetime, timedelta
@@ -422,11 +424,13 @@ def run_flow_scan(
     max_dte: int = None,
     min_dte: int = None,
     include_market_regime: bool = True,
+    top_k: Optional[int] = None,
 ) -> List[FlowSignal]:
     """
     Run a flow scan with filters and scoring
 
-    Returns list of FlowSignal objects sorted by score
+    Returns list of FlowSignal objects sorted by score. When top_k is set,
+    only the top_k highest-scoring signals are returned.
 
     IMPORTANT: ETFs (SPY, QQQ, IWM, etc.) are excluded - too much hedging noise.
     Only single stocks with clear directional flow are traded.
@@ -523,10 +527,15 @@ def run_flow_scan(
         if signal.score >= min_score:
             signals.append(signal)
 
-    # Sort by score descending
-    signals.sort(key=lambda x: x.score, reverse=True)
+    passed_count = len(signals)
 
-    print(f"  {len(signals)} signals passed score filter (>= {min_score})")
+    # Sort by score descending (partial selection when only top_k is needed)
+    if top_k is not None:
+        signals = heapq.nlargest(top_k, signals, key=operator.attrgetter("score"))
+    else:
+        signals.sort(key=operator.attrgetter("score"), reverse=True)
+
+    print(f"  {passed_count} signals passed score filter (>= {min_score})")
     if etf_skipped > 0:
         print(f"  {etf_skipped} ETF signals skipped (hedging noise)")
 
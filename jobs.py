@@ -2,32 +2,94 @@
 Background Jobs - Scheduled tasks for DQL training data and performance tracking
 """
 import argparse
-from datetime import datetime
+import functools
+from datetime import datetime, timedelta
+from alpaca.data import StockHistoricalDataClient
+from alpaca.trading.client import TradingClient
+from alpaca.trading.requests import GetCalendarRequest
 from config import ALPACA_API_KEY, ALPACA_SECRET_KEY
 
+# Static SQL used by the jobs below. Kept at module scope so each string is
+# built once and hits sqlite3's per-connection statement cache on the pooled
+# connections.
+SQL_DAILY_TRADE_COUNTS = """
+    SELECT
+        SUM(CASE WHEN status = 'open' AND date(entry_date) = :today THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'closed' AND date(exit_date) = :today THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'closed' AND date(exit_date) = :today
+                 AND pnl_pct > 0 THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'closed' AND date(exit_date) = :today
+                 AND pnl_pct <= 0 THEN 1 ELSE 0 END)
+    FROM trades
+    WHERE date(entry_date) = :today OR date(exit_date) = :today
+"""
+
+# Cutoffs are bound as ISO-8601 strings (same format the rows are written
+# with) so each DELETE is an index range scan on the timestamp column.
+# Rows are removed in chunks of CLEANUP_CHUNK_SIZE, committing after each
+# chunk, so the write lock is never held for one huge DELETE.
+CLEANUP_CHUNK_SIZE = 5000
+
+SQL_DELETE_CANDIDATES = """
+    DELETE FROM candidate_snapshots WHERE rowid IN (
+        SELECT rowid FROM candidate_snapshots WHERE timestamp < ? LIMIT ?
+    )
+"""
 
+SQL_DELETE_MARKET = """
+    DELETE FROM market_snapshots WHERE rowid IN (
+        SELECT rowid FROM market_snapshots WHERE timestamp < ? LIMIT ?
+    )
+"""
+
+SQL_DELETE_CHECKS = """
+    DELETE FROM position_checks WHERE rowid IN (
+        SELECT rowid FROM position_checks WHERE check_time < ? LIMIT ?
+    )
+"""
+
+
+@functools.lru_cache(maxsize=1)
 def get_data_client():
-    """Initialize Alpaca data client"""
-    from alpaca.data import StockHistoricalDataClient
+    """Initialize Alpaca data client (shared for the life of the process)"""
     return StockHistoricalDataClient(ALPACA_API_KEY, ALPACA_SECRET_KEY)
 
 
+@functools.lru_cache(maxsize=1)
 def get_trading_client():
-    """Initialize Alpaca trading client"""
-    from alpaca.trading.client import TradingClient
+    """Initialize Alpaca trading client (shared for the life of the process)"""
     return TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
 
 
+def is_trading_day(day) -> bool:
+    """
+    Check whether the market is open on a given date.
+
+    Weekends short-circuit without an API call; weekdays are checked
+    against Alpaca's market calendar to catch exchange holidays.
+    """
+    if day.weekday() >= 5:
+        return False
+
+    try:
+        calendar = get_trading_client().get_calendar(GetCalendarRequest(start=day, end=day))
+        return any(c.date == day for c in calendar)
+    except Exception as e:
+        print(f"  Could not fetch market calendar ({e}) - assuming trading day")
+        return True
+
+
 def daily_snapshot():
     """
     Run at market close - log daily performance.
     Captures equity, trades, and SPY comparison.
     """
-    from db import log_daily_performance, get_connection
+    from db import log_daily_performance, pool
     from executor import get_account_info, get_positions
     from scanner import get_market_context, get_data_client as get_scanner_data_client
 
-    print(f"[{datetime.now()}] Running daily performance snapshot...")
+    now = datetime.now()
+    print(f"[{now}] Running daily performance snapshot...")
 
     try:
         # Get account info
@@ -40,31 +102,19 @@ def daily_snapshot():
         spy_change = spy_data.get('change_1d', 0)
 
         # Get today's date
-        today = datetime.now().strftime('%Y-%m-%d')
+        today = now.strftime('%Y-%m-%d')
 
         # Count trades opened/closed today
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT COUNT(*) FROM trades
-            WHERE date(entry_date) = ? AND status = 'open'
-        """, (today,))
-        trades_opened = cursor.fetchone()[0]
-
-        cursor.execute("""
-            SELECT COUNT(*),
-                   SUM(CASE WHEN pnl_pct > 0 THEN 1 ELSE 0 END),
-                   SUM(CASE WHEN pnl_pct <= 0 THEN 1 ELSE 0 END)
-            FROM trades
-            WHERE date(exit_date) = ? AND status = 'closed'
-        """, (today,))
-        row = cursor.fetchone()
-        trades_closed = row[0] or 0
-        win_count = row[1] or 0
-        loss_count = row[2] or 0
-
-        conn.close()
+        with pool.checkout() as conn:
+            cursor = conn.cursor()
+
+            # Single pass over trades using conditional aggregation
+            cursor.execute(SQL_DAILY_TRADE_COUNTS, {"today": today})
+            row = cursor.fetchone()
+            trades_opened = row[0] or 0
+            trades_closed = row[1] or 0
+            win_count = row[2] or 0
+            loss_count = row[3] or 0
 
         # Calculate cash percentage
         cash_pct = account['cash'] / account['equity'] if account['equity'] > 0 else 1.0
@@ -106,16 +156,20 @@ def update_outcomes():
 
     print(f"[{datetime.now()}] Updating candidate outcomes...")
 
-    # Check if market has been closed for at least 30 minutes
     et = pytz.timezone('America/New_York')
     now_et = datetime.now(et)
-    market_close = now_et.replace(hour=16, minute=0, second=0, microsecond=0)
 
-    if now_et.weekday() < 5:  # Weekday
-        minutes_since_close = (now_et - market_close).total_seconds() / 60
-        if 0 < minutes_since_close < 30:
-            print(f"  Market closed {minutes_since_close:.0f} minutes ago - waiting for data to settle")
-            print(f"  Recommend running this job at 22:00+ UTC (5 PM+ ET)")
+    # No new closes on weekends/holidays - skip before touching the data API
+    if not is_trading_day(now_et.date()):
+        print("  Market closed today - skipping outcome update")
+        return
+
+    # Check if market has been closed for at least 30 minutes
+    market_close = now_et.replace(hour=16, minute=0, second=0, microsecond=0)
+    minutes_since_close = (now_et - market_close).total_seconds() / 60
+    if 0 < minutes_since_close < 30:
+        print(f"  Market closed {minutes_since_close:.0f} minutes ago - waiting for data to settle")
+        print(f"  Recommend running this job at 22:00+ UTC (5 PM+ ET)")
 
     try:
         data_client = get_data_client()
@@ -131,7 +185,7 @@ def update_position_tracking():
     Run periodically - update max gain/drawdown for open positions.
     This data is used for DQL reward calculation.
     """
-    from db import update_position_tracking
+    from db import update_position_tracking_batch
     from executor import get_positions
 
     print(f"[{datetime.now()}] Updating position tracking...")
@@ -139,14 +193,10 @@ def update_position_tracking():
     try:
         positions = get_positions()
 
-        for p in positions:
-            symbol = p['symbol']
-            current_price = p['current_price']
-            entry_price = p['avg_entry_price']
-
-            update_position_tracking(symbol, current_price, entry_price)
+        # Single executemany + one commit instead of one transaction per symbol
+        updated = update_position_tracking_batch(positions)
 
-        print(f"  Updated tracking for {len(positions)} positions")
+        print(f"  Updated tracking for {updated} positions")
 
     except Exception as e:
         print(f"  Error updating position tracking: {e}")
@@ -157,67 +207,53 @@ def calculate_trade_rewards():
     Run after trade closes - calculate DQL reward.
     Called automatically by update_trade_exit, but can be run manually.
     """
-    from db import get_connection, update_trade_reward
+    from db import update_missing_trade_rewards
 
     print(f"[{datetime.now()}] Calculating trade rewards...")
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Find closed trades without rewards
-        cursor.execute("""
-            SELECT id FROM trades
-            WHERE status = 'closed' AND reward IS NULL
-        """)
-
-        trades = cursor.fetchall()
-        conn.close()
+        updated = update_missing_trade_rewards()
 
-        for trade in trades:
-            update_trade_reward(trade['id'])
-
-        print(f"  Calculated rewards for {len(trades)} trades")
+        print(f"  Calculated rewards for {updated} trades")
 
     except Exception as e:
         print(f"  Error calculating rewards: {e}")
 
 
+def _delete_in_chunks(conn, sql: str, cutoff: str) -> int:
+    """Run a chunked DELETE until no rows remain, committing each chunk"""
+    total = 0
+    while True:
+        deleted = conn.execute(sql, (cutoff, CLEANUP_CHUNK_SIZE)).rowcount
+        conn.commit()
+        total += deleted
+        if deleted < CLEANUP_CHUNK_SIZE:
+            return total
+
+
 def cleanup_old_data():
     """
     Run weekly - clean up old candidate snapshots (keep last 90 days).
     """
-    from db import get_connection
+    from db import pool
+
+    now = datetime.now()
+    print(f"[{now}] Cleaning up old data...")
 
-    print(f"[{datetime.now()}] Cleaning up old data...")
+    cutoff_90d = (now - timedelta(days=90)).isoformat()
+    cutoff_30d = (now - timedelta(days=30)).isoformat()
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Delete candidate snapshots older than 90 days
-        cursor.execute("""
-            DELETE FROM candidate_snapshots
-            WHERE timestamp < datetime('now', '-90 days')
-        """)
-        deleted_candidates = cursor.rowcount
-
-        # Delete market snapshots older than 90 days
-        cursor.execute("""
-            DELETE FROM market_snapshots
-            WHERE timestamp < datetime('now', '-90 days')
-        """)
-        deleted_snapshots = cursor.rowcount
-
-        # Delete position checks older than 30 days
-        cursor.execute("""
-            DELETE FROM position_checks
-            WHERE check_time < datetime('now', '-30 days')
-        """)
-        deleted_checks = cursor.rowcount
+        # Deletes go through the dedicated write connection in small transactions
+        with pool.writer() as conn:
+            # Delete candidate snapshots older than 90 days
+            deleted_candidates = _delete_in_chunks(conn, SQL_DELETE_CANDIDATES, cutoff_90d)
 
-        conn.commit()
-        conn.close()
+            # Delete market snapshots older than 90 days
+            deleted_snapshots = _delete_in_chunks(conn, SQL_DELETE_MARKET, cutoff_90d)
+
+            # Delete position checks older than 30 days
+            deleted_checks = _delete_in_chunks(conn, SQL_DELETE_CHECKS, cutoff_30d)
 
         print(f"  Deleted {deleted_candidates} old candidate snapshots")
         print(f"  Deleted {deleted_snapshots} old market snapshots")
@@ -252,10 +288,15 @@ def backfill_dqn_experiences_job():
 
 def run_all_daily_jobs():
     """Run all daily jobs in sequence"""
+    from executor import load_symbol_caps
+
     print("=" * 60)
     print(f"DAILY JOBS - {datetime.now()}")
     print("=" * 60)
 
+    # Cap classifications can change (IPOs, splits) - re-read the universe daily
+    load_symbol_caps.cache_clear()
+
     daily_snapshot()
     update_outcomes()
     update_position_tracking()
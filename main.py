@@ -2,62 +2,51 @@
 Main Entry Point - Autonomous Momentum Trading Agent
 """
 import argparse
+import atexit
+import io
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from scanner import run_scan
-from agent import get_portfolio_decision
 from config import get_cap_config, TRADING_CONFIG, get_runtime_config
-from executor import (
-    execute_trade,
-    get_account_info,
-    get_positions,
-    close_position,
-    get_open_orders
-)
-from monitor import calculate_reversal_signals, get_data_client, get_historical_bars
-from db import log_scan, get_open_trades, get_recent_trades
+from db import log_scan, get_open_trades, get_recent_trades, acquire_scan_lock, release_scan_lock
 import requests
 import os
-import fcntl
 from dotenv import load_dotenv
 
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_ADMIN_ID = os.getenv("TELEGRAM_ADMIN_ID")
-LOCK_FILE = "/tmp/momentum_agent_scan.lock"
+
+# Telegram sends run in the background on a shared keep-alive session;
+# the pool is drained at exit so queued messages still go out.
+_TG_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="telegram")
+_TG_SESSION = requests.Session()
+atexit.register(_TG_POOL.shutdown, wait=True)
 
 
 class ScanLock:
-    """File-based lock to prevent concurrent scans"""
+    """SQLite row lock (scan_lock table) to prevent concurrent scans"""
     def __init__(self):
-        self.lock_file = None
+        self.pid = os.getpid()
         self.locked = False
 
     def acquire(self, timeout: int = 0) -> bool:
         """Try to acquire the lock. Returns True if successful."""
         try:
-            self.lock_file = open(LOCK_FILE, 'w')
-            fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
-            self.lock_file.write(f"{os.getpid()}\n{datetime.now().isoformat()}")
-            self.lock_file.flush()
-            self.locked = True
-            return True
-        except (IOError, OSError):
-            if self.lock_file:
-                self.lock_file.close()
-            self.lock_file = None
-            return False
+            self.locked = acquire_scan_lock(self.pid)
+        except Exception as e:
+            print(f"Error acquiring scan lock: {e}")
+            self.locked = False
+        return self.locked
 
     def release(self):
         """Release the lock"""
-        if self.lock_file:
+        if self.locked:
             try:
-                fcntl.flock(self.lock_file.fileno(), fcntl.LOCK_UN)
-                self.lock_file.close()
+                release_scan_lock(self.pid)
             except Exception:
                 pass
-            self.lock_file = None
             self.locked = False
 
     def __enter__(self):
@@ -73,18 +62,25 @@ def send_telegram_message(message: str):
         print("Telegram not configured, skipping notification")
         return
 
+    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    payload = {
+        "chat_id": TELEGRAM_ADMIN_ID,
+        "text": message,
+        "parse_mode": "Markdown"
+    }
     try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        payload = {
-            "chat_id": TELEGRAM_ADMIN_ID,
-            "text": message,
-            "parse_mode": "Markdown"
-        }
-        requests.post(url, json=payload, timeout=10)
+        future = _TG_POOL.submit(_TG_SESSION.post, url, json=payload, timeout=10)
+        future.add_done_callback(_report_telegram_failure)
     except Exception as e:
         print(f"Failed to send Telegram message: {e}")
 
 
+def _report_telegram_failure(future):
+    """Done-callback for background Telegram sends"""
+    if future.exception() is not None:
+        print(f"Failed to send Telegram message: {future.exception()}")
+
+
 def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str = None, max_buys: int = None):
     """
     Autonomous scan and trade execution loop.
@@ -101,6 +97,12 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
         cap: Market cap filter (large/mid/small/None for all)
         max_buys: Maximum number of buys to execute (None for no limit)
     """
+    # Heavy scan dependencies are imported here so other CLI commands start fast
+    from scanner import run_scan
+    from agent import get_portfolio_decision
+    from executor import execute_trade, get_account_info, get_positions, close_position
+    from monitor import calculate_reversal_signals_batch, get_data_client, get_historical_bars, is_stock_symbol
+
     # Acquire lock to prevent concurrent scans
     lock = ScanLock()
     if not lock.acquire():
@@ -150,22 +152,33 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
         reversal_scores = {}
         if positions:
             data_client = get_data_client()
+
+            # One batched Alpaca request for every stock position's bars
+            # (option contract symbols contain digits and would fail the whole request)
+            stock_symbols = [p['symbol'] for p in positions if is_stock_symbol(p['symbol'])]
+            bars_by_symbol = get_historical_bars(data_client, stock_symbols, days=30)
+
+            # Score every position with bar data in one vectorized pass
+            fetched = {symbol: bars for symbol, bars in bars_by_symbol.items() if bars}
+            try:
+                batch_results = calculate_reversal_signals_batch(
+                    list(fetched), list(fetched.values()), positions
+                )
+            except Exception as e:
+                print(f"    Error calculating reversal scores - {e}")
+                batch_results = {}
+
             for p in positions:
                 symbol = p['symbol']
-                try:
-                    bars = get_historical_bars(data_client, symbol, days=30)
-                    if bars:
-                        result = calculate_reversal_signals(symbol, bars, p)
-                        reversal_scores[symbol] = {
-                            "score": result.get('score', 0),
-                            "signals": result.get('signals', [])
-                        }
-                        print(f"    {symbol}: Reversal Score = {result.get('score', 0)}/13")
-                    else:
-                        print(f"    {symbol}: No bar data available")
-                        reversal_scores[symbol] = {"score": 0, "signals": []}
-                except Exception as e:
-                    print(f"    {symbol}: Error calculating reversal - {e}")
+                if bars_by_symbol.get(symbol):
+                    result = batch_results.get(symbol, {})
+                    reversal_scores[symbol] = {
+                        "score": result.get('score', 0),
+                        "signals": result.get('signals', [])
+                    }
+                    print(f"    {symbol}: Reversal Score = {result.get('score', 0)}/13")
+                else:
+                    print(f"    {symbol}: No bar data available")
                     reversal_scores[symbol] = {"score": 0, "signals": []}
 
         # Check if we should skip new buys (positions healthy AND near capacity)
@@ -237,10 +250,6 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
         buys = execution_plan.get('buys', [])
         watchlist = execution_plan.get('new_watchlist', [])
 
-        # Get cap config for max_buys if not specified via CLI
-        cap_config = get_cap_config(cap)
-        effective_max_buys = max_buys if max_buys is not None else cap_config.get('max_buys_per_scan', 2)
-
         # Limit buys based on effective max
         if len(buys) > effective_max_buys:
             print(f"\n  Limiting buys from {len(buys)} to {effective_max_buys} (cap config)")
@@ -261,6 +270,14 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
             "errors": []
         }
 
+        # Index decision data by symbol once instead of scanning per order
+        candidates_by_symbol = {c['symbol']: c for c in candidates}
+        close_reasons = {
+            a['symbol']: a['reasoning']
+            for a in decision.get('position_actions', [])
+            if a['action'] == 'CLOSE'
+        }
+
         # Execute CLOSE orders
         for symbol in closes:
             if dry_run:
@@ -270,11 +287,7 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
                 print(f"  Closing {symbol}...")
                 try:
                     # Find reasoning from decision
-                    reason = next(
-                        (a['reasoning'] for a in decision.get('position_actions', [])
-                         if a['symbol'] == symbol and a['action'] == 'CLOSE'),
-                        'Agent decision'
-                    )
+                    reason = close_reasons.get(symbol, 'Agent decision')
                     result = close_position(symbol, reason)
                     if result.get('success'):
                         print(f"    ✓ Closed {symbol}: {result.get('qty')} shares")
@@ -295,7 +308,7 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
 
         for symbol in buys:
             # Find candidate data
-            candidate = next((c for c in candidates if c['symbol'] == symbol), None)
+            candidate = candidates_by_symbol.get(symbol)
             if not candidate:
                 print(f"  ✗ Cannot buy {symbol}: Not in candidates list")
                 results["errors"].append({"symbol": symbol, "action": "buy", "error": "Not in candidates"})
@@ -321,37 +334,36 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
         # ========== Log and Notify ==========
         log_scan(candidates, decision, buys[0] if buys else None)
 
-        # Build Telegram summary
+        # Build Telegram summary (each section after the header starts with a newline)
         scan_emoji = {"open": "🌅", "midday": "☀️", "close": "🌆"}.get(scan_type, "📊")
         cap_emoji = {"large": "🔵", "mid": "🟡", "small": "🟢"}.get(cap, "⚪")
         max_total_positions = TRADING_CONFIG["max_positions"]
-        summary_lines = [
-            f"{scan_emoji} *{scan_type.upper()} SCAN COMPLETE*",
-            f"{cap_emoji} Cap: {cap_label}" if cap else "",
-            f"_{datetime.now().strftime('%Y-%m-%d %H:%M')} ET_\n",
-            f"💰 Equity: ${account['equity']:,.2f}",
-            f"📊 Positions: {len(positions)}/{max_total_positions}\n",
-        ]
-        summary_lines = [line for line in summary_lines if line]  # Remove empty lines
+        summary = io.StringIO()
+        summary.write(f"{scan_emoji} *{scan_type.upper()} SCAN COMPLETE*")
+        if cap:
+            summary.write(f"\n{cap_emoji} Cap: {cap_label}")
+        summary.write(f"\n_{datetime.now().strftime('%Y-%m-%d %H:%M')} ET_\n")
+        summary.write(f"\n💰 Equity: ${account['equity']:,.2f}")
+        summary.write(f"\n📊 Positions: {len(positions)}/{max_total_positions}\n")
 
         if decision.get('market_assessment'):
-            summary_lines.append(f"*Market:* {decision['market_assessment'][:150]}\n")
+            summary.write(f"\n*Market:* {decision['market_assessment'][:150]}\n")
 
         if closes:
-            summary_lines.append(f"🔴 *CLOSED:* {', '.join(closes)}")
+            summary.write(f"\n🔴 *CLOSED:* {', '.join(closes)}")
         if buys:
-            summary_lines.append(f"🟢 *BOUGHT:* {', '.join(buys)}")
+            summary.write(f"\n🟢 *BOUGHT:* {', '.join(buys)}")
         if skip_new_buys:
-            summary_lines.append("⏸️ _Buys skipped - positions healthy, letting winners run_")
+            summary.write("\n⏸️ _Buys skipped - positions healthy, letting winners run_")
         if watchlist:
-            summary_lines.append(f"👀 *WATCHING:* {', '.join(watchlist)}")
+            summary.write(f"\n👀 *WATCHING:* {', '.join(watchlist)}")
         if not closes and not buys and not skip_new_buys:
-            summary_lines.append("_No trades executed_")
+            summary.write("\n_No trades executed_")
 
         if results["errors"]:
-            summary_lines.append(f"\n⚠️ *Errors:* {len(results['errors'])}")
+            summary.write(f"\n\n⚠️ *Errors:* {len(results['errors'])}")
 
-        send_telegram_message("\n".join(summary_lines))
+        send_telegram_message(summary.getvalue())
 
         print("\n" + "=" * 70)
         print("Scan complete.")
@@ -365,6 +377,8 @@ def run_autonomous_scan(scan_type: str = "open", dry_run: bool = False, cap: str
 
 def check_positions():
     """Position check (legacy)"""
+    from executor import get_account_info, get_positions, get_open_orders
+
     print("=" * 60)
     print(f"POSITION CHECK - {datetime.now()}")
     print("=" * 60)
@@ -402,21 +416,29 @@ def show_history():
         print("\nNo trade history yet.")
         return
 
-    wins = sum(1 for t in trades if t.get("pnl_pct", 0) > 0 and t["status"] == "closed")
-    losses = sum(1 for t in trades if t.get("pnl_pct", 0) <= 0 and t["status"] == "closed")
-    open_trades = sum(1 for t in trades if t["status"] == "open")
-
-    print(f"\nSummary: {wins}W / {losses}L / {open_trades} Open")
-
-    print("\nRecent Trades:")
+    # Single pass: tally counts and render lines together
+    wins = losses = open_trades = 0
+    rendered = []
     for t in trades:
         status = t["status"]
         if status == "closed":
             pnl = t.get("pnl_pct", 0)
-            emoji = "✓" if pnl > 0 else "✗"
-            print(f"  {emoji} {t['symbol']}: {pnl:.1f}% ({t.get('exit_reason', 'N/A')})")
+            if pnl > 0:
+                wins += 1
+                emoji = "✓"
+            else:
+                losses += 1
+                emoji = "✗"
+            rendered.append(f"  {emoji} {t['symbol']}: {pnl:.1f}% ({t.get('exit_reason', 'N/A')})")
         else:
-            print(f"  ○ {t['symbol']}: OPEN @ ${t['entry_price']:.2f}")
+            if status == "open":
+                open_trades += 1
+            rendered.append(f"  ○ {t['symbol']}: OPEN @ ${t['entry_price']:.2f}")
+
+    print(f"\nSummary: {wins}W / {losses}L / {open_trades} Open")
+
+    print("\nRecent Trades:")
+    print("\n".join(rendered))
 
 
 def main():
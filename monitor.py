@@ -2,9 +2,16 @@
 Position Monitor - Detects early reversal signals and alerts via Telegram
 """
 import os
+import re
+import logging
+import functools
 import json
 import requests
+from requests.adapters import HTTPAdapter
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from alpaca.data import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
@@ -12,91 +19,213 @@ from alpaca.data.timeframe import TimeFrame
 
 from config import ALPACA_API_KEY, ALPACA_SECRET_KEY, get_runtime_config
 from executor import get_positions, close_position
-from db import get_trade_by_symbol
-import pytz
+from db import POSITION_CHECK_INDICATOR_COLUMNS, get_open_trades_by_symbol, pool
 
 load_dotenv()
 
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('monitor')
+
+# File handler for monitor logs
+try:
+    from pathlib import Path
+    log_dir = Path("logs")
+    log_dir.mkdir(exist_ok=True)
+    file_handler = logging.FileHandler(log_dir / "monitor.log")
+    file_handler.setFormatter(logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    ))
+    logger.addHandler(file_handler)
+except Exception as e:
+    print(f"Warning: Could not set up file logging: {e}")
+
 # Market hours (Eastern Time)
-MARKET_TZ = pytz.timezone("US/Eastern")
-MARKET_OPEN = 9  # 9:30 AM, but we check from 10:00 AM
-MARKET_CLOSE = 16  # 4:00 PM
+MARKET_TZ = ZoneInfo("US/Eastern")
+MARKET_OPEN_HHMM = 930  # 9:30 AM
+MARKET_CLOSE_HHMM = 1600  # 4:00 PM
+
+# Concurrent per-position workers in run_monitor
+MONITOR_WORKERS = 8
+
+# Bars needed for reversal signals: 20-day volume average + current bar
+REVERSAL_WINDOW = 21
+
 
+# Option contract symbols (OCC format) always carry digits; stock tickers never do
+_DIGIT_RE = re.compile(r"\d")
 
-def is_market_hours() -> bool:
+
+def is_stock_symbol(symbol: str) -> bool:
+    """True for stock tickers (incl. class shares like BRK.B), False for option contracts"""
+    return _DIGIT_RE.search(symbol) is None
+
+
+def is_market_hours(now_et: datetime = None) -> bool:
     """Check if current time is during US market hours (Mon-Fri 9:30 AM - 4:00 PM ET)"""
-    now_et = datetime.now(MARKET_TZ)
+    if now_et is None:
+        now_et = datetime.now(MARKET_TZ)
     # Weekday check (0=Monday, 4=Friday)
     if now_et.weekday() > 4:
         return False
-    # Hour check (9:30 AM to 4:00 PM)
-    if now_et.hour < MARKET_OPEN or now_et.hour >= MARKET_CLOSE:
-        return False
-    if now_et.hour == MARKET_OPEN and now_et.minute < 30:
-        return False
-    return True
+    hhmm = now_et.hour * 100 + now_et.minute
+    return MARKET_OPEN_HHMM <= hhmm < MARKET_CLOSE_HHMM
 
 
 # Telegram config
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_ADMIN_ID = os.getenv("TELEGRAM_ADMIN_ID")
 
+# Telegram caps messages at 4096 chars; leave headroom for Markdown
+TELEGRAM_MAX_CHARS = 4000
+ALERT_SEPARATOR = "\n\n━━━━━━━━━━\n\n"
+
+# Shared keep-alive session so repeated alerts reuse one HTTPS connection
+_TG_SESSION = requests.Session()
+_TG_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
 
+
+@functools.lru_cache(maxsize=1)
 def get_data_client() -> StockHistoricalDataClient:
-    """Initialize Alpaca data client"""
+    """Initialize Alpaca data client (one shared instance per process)"""
     return StockHistoricalDataClient(ALPACA_API_KEY, ALPACA_SECRET_KEY)
 
 
-def get_historical_bars(client: StockHistoricalDataClient, symbol: str, days: int = 30) -> list:
-    """Fetch historical daily bars for a symbol"""
+def get_historical_bars(client: StockHistoricalDataClient, symbols: list, days: int = 30) -> dict:
+    """
+    Fetch historical daily bars for several symbols in one request.
+
+    Returns dict of {symbol: [bars]}; symbols without data are absent.
+    """
+    if not symbols:
+        return {}
+
     end = datetime.now()
     start = end - timedelta(days=days + 10)  # Buffer for weekends/holidays
 
     try:
         request = StockBarsRequest(
-            symbol_or_symbols=symbol,
+            symbol_or_symbols=list(symbols),
             timeframe=TimeFrame.Day,
             start=start,
             end=end
         )
         bars = client.get_stock_bars(request)
-        return bars.data.get(symbol, [])
+        return bars.data
     except Exception as e:
-        print(f"Error fetching bars for {symbol}: {e}")
-        return []
+        logger.error(f"Error fetching bars for {', '.join(symbols)}: {e}")
+        return {}
+
+
+def calculate_rsi_pair(closes, period: int = 14) -> tuple[float, float]:
+    """
+    Calculate Wilder-smoothed RSI for the latest bar and the bar before it.
 
+    Seeds the average gain/loss with the first 'period' changes. Wilder
+    smoothing is an exponential average with alpha = 1/period, so instead
+    of stepping through the remaining changes one at a time both smoothed
+    averages are evaluated in closed form as a decay-weighted dot product.
 
-def calculate_rsi(closes: list, period: int = 14) -> float:
-    """Calculate RSI"""
+    Returns (rsi_current, rsi_prev); 50.0 (neutral) where history is too short.
+    """
+    closes = np.asarray(closes, dtype=np.float64)
     if len(closes) < period + 1:
-        return 50.0  # Default neutral
+        return 50.0, 50.0
 
-    gains = []
-    losses = []
+    diffs = np.diff(closes)
+    gains = np.where(diffs > 0, diffs, 0.0)
+    losses = np.where(diffs < 0, -diffs, 0.0)
 
-    for i in range(1, len(closes)):
-        change = closes[i] - closes[i-1]
-        if change > 0:
-            gains.append(change)
-            losses.append(0)
-        else:
-            gains.append(0)
-            losses.append(abs(change))
+    seeds = np.array([gains[:period].mean(), losses[:period].mean()])
+    tail = np.vstack((gains[period:], losses[period:]))  # (gain/loss, steps)
+    steps = tail.shape[1]
+    if steps == 0:
+        return _rsi_value(*seeds), 50.0
+
+    decay = 1 - 1 / period
+    weights = decay ** np.arange(steps - 1, -1, -1)
+    current = decay ** steps * seeds + (tail @ weights) / period
+    prev = decay ** (steps - 1) * seeds + (tail[:, :-1] @ weights[1:]) / period
 
-    # Use last 'period' values
-    recent_gains = gains[-period:]
-    recent_losses = losses[-period:]
+    return _rsi_value(*current), _rsi_value(*prev)
 
-    avg_gain = sum(recent_gains) / period
-    avg_loss = sum(recent_losses) / period
 
+def _rsi_value(avg_gain: float, avg_loss: float) -> float:
+    """RSI from average gain/loss"""
     if avg_loss == 0:
         return 100.0
-
     rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
+    return float(100 - (100 / (1 + rs)))
+
+
+def bars_to_array(bars: list) -> np.ndarray:
+    """
+    Build an (n_days, 5) OHLCV array from Alpaca bars in chronological order.
+
+    Alpaca returns bars ascending already, so the timestamps are only
+    checked; rows are reordered via argsort just when they're out of order.
+    """
+    arr = np.array(
+        [(b.timestamp.timestamp(), b.open, b.high, b.low, b.close, b.volume) for b in bars],
+        dtype=np.float64
+    )
+    ts = arr[:, 0]
+    if (ts[1:] < ts[:-1]).any():
+        arr = arr[np.argsort(ts, kind="stable")]
+    return arr[:, 1:]
+
 
-    return rsi
+def compute_indicators(window: np.ndarray) -> tuple:
+    """
+    Compute the price/volume reversal indicators over trailing OHLCV bars.
+
+    window is (..., REVERSAL_WINDOW, 5) - one symbol or a stack of them.
+    The trailing slices are taken once as views and shared by every
+    indicator; each result keeps the leading shape.
+
+    Returns (sma_7, sma_20, close_position, volume_ratio, high_5d, current)
+    where close_position is NaN for a zero-range bar and current is the
+    latest (open, high, low, close, volume) row.
+    """
+    highs = window[..., 1]
+    closes = window[..., 3]
+    volumes = window[..., 4]
+    current = window[..., -1, :]
+
+    tail7 = closes[..., -7:]
+    tail20 = closes[..., -20:]
+    vol_tail = volumes[..., -21:-1]
+    highs_tail = highs[..., -6:-1]  # Previous 5 days' high
+
+    sma_7 = tail7.mean(axis=-1)
+    sma_20 = tail20.mean(axis=-1)
+
+    daily_range = current[..., 1] - current[..., 2]
+    avg_volume_20 = vol_tail.mean(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        close_position = np.where(daily_range > 0, (current[..., 3] - current[..., 2]) / daily_range, np.nan)
+        volume_ratio = np.where(avg_volume_20 > 0, current[..., 4] / avg_volume_20, 0.0)
+
+    high_5d = highs_tail.max(axis=-1)
+
+    return sma_7, sma_20, close_position, volume_ratio, high_5d, current
+
+
+def _score_indicators(indicators: tuple, idx, rsi_pair: tuple) -> dict:
+    """Score one symbol's row (idx) of compute_indicators() output"""
+    sma_7, sma_20, close_position, volume_ratio, high_5d, current = indicators
+    close_pos = float(close_position[idx])
+    current_open, current_high, _, current_close, _ = current[idx].tolist()
+
+    return _score_reversal(
+        float(sma_7[idx]), float(sma_20[idx]),
+        None if np.isnan(close_pos) else close_pos,
+        float(volume_ratio[idx]), rsi_pair[0], rsi_pair[1], float(high_5d[idx]),
+        current_open, current_high, current_close
+    )
 
 
 def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
@@ -108,33 +237,63 @@ def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
     - score: total reversal score
     - details: signal details
     """
-    if len(bars) < 21:
+    if len(bars) < REVERSAL_WINDOW:
         return {"signals": [], "score": 0, "details": {}}
 
-    # Sort bars by timestamp
-    bars = sorted(bars, key=lambda x: x.timestamp)
+    arr = bars_to_array(bars)
+    indicators = compute_indicators(arr[-REVERSAL_WINDOW:])
+
+    return _score_indicators(indicators, (), rsi_pair=calculate_rsi_pair(arr[:, 3]))
 
-    # Extract arrays
-    closes = [b.close for b in bars]
-    highs = [b.high for b in bars]
-    lows = [b.low for b in bars]
-    volumes = [b.volume for b in bars]
-    opens = [b.open for b in bars]
 
+def calculate_reversal_signals_batch(symbols: list, bars_list: list, positions: list) -> dict:
+    """
+    Calculate reversal signals for many positions in one vectorized pass.
+
+    The trailing REVERSAL_WINDOW bars of every symbol are stacked into a
+    (n_positions, n_days, 5) array and passed through compute_indicators
+    in one call (Wilder RSI still walks each symbol's full history).
+    Produces the same output as calculate_reversal_signals.
+
+    Returns dict of {symbol: {signals, score, details}}.
+    """
+    results = {}
+    valid_symbols = []
+    windows = []
+    histories = []
+
+    for symbol, bars in zip(symbols, bars_list):
+        if len(bars) < REVERSAL_WINDOW:
+            results[symbol] = {"signals": [], "score": 0, "details": {}}
+            continue
+        arr = bars_to_array(bars)
+        # Wilder RSI depends on the full history, so it's computed per symbol
+        histories.append(arr[:, 3])
+        windows.append(arr[-REVERSAL_WINDOW:])
+        valid_symbols.append(symbol)
+
+    if not valid_symbols:
+        return results
+
+    indicators = compute_indicators(np.stack(windows))
+
+    for i, symbol in enumerate(valid_symbols):
+        results[symbol] = _score_indicators(
+            indicators, i, rsi_pair=calculate_rsi_pair(histories[i])
+        )
+
+    return results
+
+
+def _score_reversal(sma_7: float, sma_20: float, close_position: float, volume_ratio: float,
+                    rsi_current: float, rsi_prev: float, high_5d: float,
+                    current_open: float, current_high: float, current_close: float) -> dict:
+    """Turn computed indicators into reversal signals, score and details"""
     signals = []
     score = 0
     details = {}
 
-    # Current values
-    current_close = closes[-1]
-    current_high = highs[-1]
-    current_low = lows[-1]
-    current_volume = volumes[-1]
-    current_open = opens[-1]
-
     # 1. SMA Bearish Cross (7 < 20) - Score: 3
-    sma_7 = sum(closes[-7:]) / 7
-    sma_20 = sum(closes[-20:]) / 20
     details["sma_7"] = round(sma_7, 2)
     details["sma_20"] = round(sma_20, 2)
 
@@ -143,9 +302,7 @@ def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
         score += 3
 
     # 2. Close in lower 30% of range - Score: 2
-    daily_range = current_high - current_low
-    if daily_range > 0:
-        close_position = (current_close - current_low) / daily_range
+    if close_position is not None:
         details["close_position"] = round(close_position, 2)
 
         if close_position < 0.3:
@@ -153,8 +310,6 @@ def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
             score += 2
 
     # 3. Distribution volume (red day + volume > 1.5x avg) - Score: 3
-    avg_volume_20 = sum(volumes[-21:-1]) / 20
-    volume_ratio = current_volume / avg_volume_20 if avg_volume_20 > 0 else 0
     is_red_day = current_close < current_open
     details["volume_ratio"] = round(volume_ratio, 2)
     details["is_red_day"] = is_red_day
@@ -164,8 +319,6 @@ def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
         score += 3
 
     # 4. RSI breakdown (was >70, now dropping below 60) - Score: 2
-    rsi_current = calculate_rsi(closes)
-    rsi_prev = calculate_rsi(closes[:-1]) if len(closes) > 15 else 50
     details["rsi"] = round(rsi_current, 1)
     details["rsi_prev"] = round(rsi_prev, 1)
 
@@ -174,7 +327,6 @@ def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
         score += 2
 
     # 5. Failed breakout (hit 5-day high but closing red) - Score: 3
-    high_5d = max(highs[-6:-1])  # Previous 5 days' high
     details["high_5d"] = round(high_5d, 2)
 
     if current_high > high_5d and current_close < current_open:
@@ -188,37 +340,35 @@ def calculate_reversal_signals(symbol: str, bars: list, position: dict) -> dict:
     }
 
 
-def send_telegram_alert(symbol: str, score: int, signals: list, pnl_pct: float, auto_closed: bool = False):
-    """Send reversal alert to Telegram"""
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_ADMIN_ID:
-        print("Telegram not configured, skipping alert")
-        return
+_ALERT_TEMPLATE = (
+    "{emoji} *REVERSAL ALERT: {symbol}*\n\n"
+    "Score: {score}/13 ({severity})\n\n"
+    "Signals detected:\n{signals}\n\n"
+    "{pnl_emoji} P/L at alert: {pnl:+.1f}%\n\n"
+    "{action}"
+)
+_AUTO_CLOSED_ACTION = "*AUTO-CLOSED* - Position exited automatically"
 
-    config = get_runtime_config()
-    auto_close_threshold = config.get('auto_close_threshold', 5)
-
-    severity = "STRONG" if score >= auto_close_threshold else "WEAK"
-    emoji = "🚨" if score >= auto_close_threshold else "⚠️"
-
-    signal_list = "\n".join(f"  • {s}" for s in signals)
-    pnl_emoji = "🟢" if pnl_pct >= 0 else "🔴"
-
-    if auto_closed:
-        action_text = f"*AUTO-CLOSED* - Position exited automatically"
-    else:
-        action_text = f"Action: `/close {symbol}` to exit"
 
-    message = f"""{emoji} *REVERSAL ALERT: {symbol}*
+def format_alert(symbol: str, score: int, signals: list, pnl_pct: float, auto_closed: bool,
+                 auto_close_threshold: int) -> str:
+    """Format a single reversal alert as Telegram Markdown"""
+    strong = score >= auto_close_threshold
 
-Score: {score}/13 ({severity})
-
-Signals detected:
-{signal_list}
-
-{pnl_emoji} P/L at alert: {pnl_pct:+.1f}%
+    return _ALERT_TEMPLATE.format_map({
+        "emoji": "🚨" if strong else "⚠️",
+        "symbol": symbol,
+        "score": score,
+        "severity": "STRONG" if strong else "WEAK",
+        "signals": "\n".join(["  • " + s for s in signals]),
+        "pnl_emoji": "🟢" if pnl_pct >= 0 else "🔴",
+        "pnl": pnl_pct,
+        "action": _AUTO_CLOSED_ACTION if auto_closed else "Action: `/close " + symbol + "` to exit",
+    })
 
-{action_text}"""
 
+def _post_telegram(message: str) -> bool:
+    """Post a Markdown message to the admin chat. Returns True on success."""
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {
         "chat_id": TELEGRAM_ADMIN_ID,
@@ -227,167 +377,225 @@ Signals detected:
     }
 
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = _TG_SESSION.post(url, json=payload, timeout=10)
         if response.status_code == 200:
-            print(f"Alert sent for {symbol}")
-        else:
-            print(f"Failed to send alert: {response.text}")
+            return True
+        logger.error(f"Failed to send alert: {response.text}")
     except Exception as e:
-        print(f"Error sending Telegram alert: {e}")
+        logger.error(f"Error sending Telegram alert: {e}")
+    return False
 
 
-def log_position_check(symbol: str, score: int, signals: list, details: dict, pnl_pct: float):
-    """Log position check to database"""
-    import sqlite3
-    from config import DB_PATH
+def send_telegram_batch(alerts: list, auto_close_threshold: int = None):
+    """
+    Send a monitor cycle's reversal alerts as few Telegram messages as possible.
+
+    Alerts are joined into messages of up to TELEGRAM_MAX_CHARS, splitting
+    only when the next alert would not fit.
+
+    Args:
+        alerts: List of dicts with symbol, score, signals, pnl_pct, auto_closed
+    """
+    if not alerts:
+        return
+
+    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_ADMIN_ID:
+        logger.warning("Telegram not configured, skipping alert")
+        return
+
+    if auto_close_threshold is None:
+        auto_close_threshold = get_runtime_config().get('auto_close_threshold', 5)
+
+    messages = []
+    current = ""
+    for alert in alerts:
+        text = format_alert(
+            alert["symbol"], alert["score"], alert["signals"], alert["pnl_pct"],
+            alert["auto_closed"], auto_close_threshold
+        )
+        if current and len(current) + len(ALERT_SEPARATOR) + len(text) > TELEGRAM_MAX_CHARS:
+            messages.append(current)
+            current = text
+        else:
+            current = f"{current}{ALERT_SEPARATOR}{text}" if current else text
+    messages.append(current)
+
+    sent = sum(1 for message in messages if _post_telegram(message))
+    logger.info(f"Sent {len(alerts)} alerts in {sent}/{len(messages)} message(s)")
+
+
+def log_position_checks(rows: list):
+    """
+    Log a monitor cycle's position checks in a single transaction.
+
+    Indicator details go into fixed columns (missing keys become NULL), so
+    only the signals list needs JSON encoding.
+
+    Args:
+        rows: List of (symbol, score, signals, details, pnl_pct) tuples
+    """
+    if not rows:
+        return
+
+    check_time = datetime.now().isoformat()
+    columns = [name for name, _ in POSITION_CHECK_INDICATOR_COLUMNS]
 
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-
-        # Create table if not exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS position_checks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                check_time TEXT NOT NULL,
-                symbol TEXT NOT NULL,
-                score INTEGER NOT NULL,
-                signals TEXT,
-                details TEXT,
-                pnl_pct REAL,
-                alert_sent INTEGER DEFAULT 0
-            )
-        """)
-
-        cursor.execute("""
-            INSERT INTO position_checks (check_time, symbol, score, signals, details, pnl_pct, alert_sent)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now().isoformat(),
+        with pool.writer() as conn:
+            conn.executemany(f"""
+                INSERT INTO position_checks
+                    (check_time, symbol, score, signals, pnl_pct, alert_sent, {", ".join(columns)})
+                VALUES (?, ?, ?, ?, ?, ?, {", ".join("?" * len(columns))})
+            """, [
+                (
+                    check_time,
+                    symbol,
+                    score,
+                    json.dumps(signals),
+                    pnl_pct,
+                    1 if score >= 3 else 0,
+                    *[details.get(name) for name in columns]
+                )
+                for symbol, score, signals, details, pnl_pct in rows
+            ])
+    except Exception as e:
+        logger.error(f"Error logging position checks: {e}")
+
+
+def process_position(position: dict, bars: list, config: dict, trade: dict, log: list) -> dict:
+    """
+    Score one position and auto-close it if warranted.
+
+    Runs on a worker thread, so progress lines are appended to 'log' and
+    logged by the caller in position order.
+
+    Returns the result dict (with "auto_closed" and "alert" set), or None
+    when there isn't enough bar data.
+    """
+    symbol = position["symbol"]
+    pnl_pct = position["unrealized_plpc"] * 100
+    auto_close_enabled = config.get('auto_close_enabled', True)
+    auto_close_threshold = config.get('auto_close_threshold', 5)
+    alert_threshold = config.get('alert_threshold', 3)
+
+    log.append(f"Checking {symbol} (P/L: {pnl_pct:+.1f}%)...")
+
+    if len(bars) < 21:
+        log.append(f"  Insufficient data ({len(bars)} bars)")
+        return None
+
+    # Calculate reversal signals
+    result = calculate_reversal_signals(symbol, bars, position)
+    result["symbol"] = symbol
+    result["pnl_pct"] = pnl_pct
+    result["auto_closed"] = False
+    result["alert"] = False
+
+    log.append(f"  Score: {result['score']}/13")
+    if result["signals"]:
+        log.append(f"  Signals: {', '.join(result['signals'])}")
+
+    # Handle based on score
+    if result["score"] >= auto_close_threshold and auto_close_enabled:
+        result["alert"] = True
+
+        # Calculate days held before auto-closing (trade is the open DB trade, if any)
+        days_held = 0
+        if trade and trade.get('entry_date'):
+            try:
+                entry_date = datetime.fromisoformat(trade['entry_date'][:10])
+                days_held = (datetime.now() - entry_date).days
+            except Exception:
+                pass
+
+        # Skip auto-close if held < 2 days (let positions develop)
+        if days_held < 2:
+            log.append(f"  ⏳ MIN HOLD PROTECTION: Skipping auto-close (held {days_held} days, need 2+)")
+            return result
+
+        # Skip auto-close if position is a big winner (let winners run)
+        if pnl_pct >= 5.0:
+            log.append(f"  💰 WINNER PROTECTION: Skipping auto-close (P/L: +{pnl_pct:.1f}%)")
+            return result
+
+        # Strong reversal with sufficient hold time - auto-close position
+        log.append(f"  🚨 STRONG REVERSAL (score >= {auto_close_threshold}, held {days_held} days) - AUTO-CLOSING!")
+        close_result = close_position(
             symbol,
-            score,
-            json.dumps(signals),
-            json.dumps(details),
-            pnl_pct,
-            1 if score >= 3 else 0
-        ))
+            reason=f"auto_reversal_score_{result['score']}",
+            reversal_signals=result.get("signals", [])
+        )
+        if close_result.get("success"):
+            log.append(f"  ✓ Position closed: {close_result['qty']} shares")
+            result["auto_closed"] = True
+        else:
+            log.append(f"  ✗ Failed to close: {close_result.get('error')}")
+    elif result["score"] >= alert_threshold:
+        # Weak reversal - alert only
+        log.append(f"  ⚠️ ALERT TRIGGERED (score >= {alert_threshold})!")
+        result["alert"] = True
 
-        conn.commit()
-        conn.close()
-    except Exception as e:
-        print(f"Error logging position check: {e}")
+    return result
 
 
 def run_monitor():
     """Main monitoring function"""
-    print(f"[{datetime.now()}] Running position monitor...")
+    logger.info("Running position monitor...")
 
     # Get open positions
     positions = get_positions()
 
     # Filter out options (symbols with numbers like SPY260106C00695000)
-    stock_positions = [p for p in positions if not any(c.isdigit() for c in p["symbol"])]
+    stock_positions = [p for p in positions if is_stock_symbol(p["symbol"])]
 
     if not stock_positions:
-        print("No stock positions to monitor")
+        logger.info("No stock positions to monitor")
         return []
 
-    print(f"Monitoring {len(stock_positions)} positions: {[p['symbol'] for p in stock_positions]}")
+    logger.info(f"Monitoring {len(stock_positions)} positions: {[p['symbol'] for p in stock_positions]}")
+
+    # Read runtime config once per cycle
+    config = get_runtime_config()
+    auto_close_threshold = config.get('auto_close_threshold', 5)
 
-    # Initialize data client
+    # Initialize data client and fetch bars for every position in one request
     client = get_data_client()
+    bars_by_symbol = get_historical_bars(client, [p["symbol"] for p in stock_positions])
+
+    # Load every open trade in one query for the days-held check
+    open_trades = get_open_trades_by_symbol()
+
+    # Auto-closes are independent network/DB I/O per symbol, so positions
+    # are processed concurrently
+    logs = [[] for _ in stock_positions]
+    with ThreadPoolExecutor(max_workers=MONITOR_WORKERS) as executor:
+        processed = list(executor.map(
+            lambda position, log: process_position(
+                position, bars_by_symbol.get(position["symbol"], []), config,
+                open_trades.get(position["symbol"]), log
+            ),
+            stock_positions, logs
+        ))
 
     results = []
+    check_rows = []
+    alerts = []
 
-    for position in stock_positions:
-        symbol = position["symbol"]
-        pnl_pct = position["unrealized_plpc"] * 100
-
-        print(f"\nChecking {symbol} (P/L: {pnl_pct:+.1f}%)...")
-
-        # Get historical bars
-        bars = get_historical_bars(client, symbol)
-
-        if len(bars) < 21:
-            print(f"  Insufficient data ({len(bars)} bars)")
+    for log, result in zip(logs, processed):
+        for line in log:
+            logger.info(line)
+        if result is None:
             continue
 
-        # Calculate reversal signals
-        result = calculate_reversal_signals(symbol, bars, position)
-        result["symbol"] = symbol
-        result["pnl_pct"] = pnl_pct
-
-        print(f"  Score: {result['score']}/13")
-        if result["signals"]:
-            print(f"  Signals: {', '.join(result['signals'])}")
-
-        # Log to database
-        log_position_check(
-            symbol,
-            result["score"],
-            result["signals"],
-            result["details"],
-            pnl_pct
-        )
-
-        # Get current config settings
-        config = get_runtime_config()
-        auto_close_enabled = config.get('auto_close_enabled', True)
-        auto_close_threshold = config.get('auto_close_threshold', 5)
-        alert_threshold = config.get('alert_threshold', 3)
-
-        # Handle based on score
-        if result["score"] >= auto_close_threshold and auto_close_enabled:
-            # Calculate days held before auto-closing
-            trade = get_trade_by_symbol(symbol, "open")
-            days_held = 0
-            if trade and trade.get('entry_date'):
-                try:
-                    entry_date = datetime.fromisoformat(trade['entry_date'][:10])
-                    days_held = (datetime.now() - entry_date).days
-                except Exception:
-                    pass
-
-            # Skip auto-close if held < 2 days (let positions develop)
-            if days_held < 2:
-                print(f"  ⏳ MIN HOLD PROTECTION: Skipping auto-close (held {days_held} days, need 2+)")
-                send_telegram_alert(symbol, result["score"], result["signals"], pnl_pct, auto_closed=False)
-                result["auto_closed"] = False
-                results.append(result)
-                continue
-
-            # Skip auto-close if position is a big winner (let winners run)
-            if pnl_pct >= 5.0:
-                print(f"  💰 WINNER PROTECTION: Skipping auto-close (P/L: +{pnl_pct:.1f}%)")
-                send_telegram_alert(symbol, result["score"], result["signals"], pnl_pct, auto_closed=False)
-                result["auto_closed"] = False
-                results.append(result)
-                continue
-
-            # Strong reversal with sufficient hold time - auto-close position
-            print(f"  🚨 STRONG REVERSAL (score >= {auto_close_threshold}, held {days_held} days) - AUTO-CLOSING!")
-            close_result = close_position(
-                symbol,
-                reason=f"auto_reversal_score_{result['score']}",
-                reversal_signals=result.get("signals", [])
-            )
-            if close_result.get("success"):
-                print(f"  ✓ Position closed: {close_result['qty']} shares")
-                send_telegram_alert(symbol, result["score"], result["signals"], pnl_pct, auto_closed=True)
-                result["auto_closed"] = True
-            else:
-                print(f"  ✗ Failed to close: {close_result.get('error')}")
-                send_telegram_alert(symbol, result["score"], result["signals"], pnl_pct, auto_closed=False)
-                result["auto_closed"] = False
-        elif result["score"] >= alert_threshold:
-            # Weak reversal - alert only
-            print(f"  ⚠️ ALERT TRIGGERED (score >= {alert_threshold})!")
-            send_telegram_alert(symbol, result["score"], result["signals"], pnl_pct, auto_closed=False)
-            result["auto_closed"] = False
-
+        check_rows.append((result["symbol"], result["score"], result["signals"], result["details"], result["pnl_pct"]))
+        if result.pop("alert"):
+            alerts.append(dict(result))
         results.append(result)
 
-    print(f"\n[{datetime.now()}] Monitor complete. Checked {len(results)} positions.")
+    log_position_checks(check_rows)
+    send_telegram_batch(alerts, auto_close_threshold=auto_close_threshold)
+
+    logger.info(f"Monitor complete. Checked {len(results)} positions.")
     return results
 
 
@@ -397,8 +605,8 @@ if __name__ == "__main__":
     # Check for --force flag to skip market hours check
     force_run = "--force" in sys.argv
 
-    if not force_run and not is_market_hours():
-        now_et = datetime.now(MARKET_TZ)
+    now_et = datetime.now(MARKET_TZ)
+    if not force_run and not is_market_hours(now_et):
         print(f"[{now_et}] Outside market hours. Use --force to run anyway.")
         sys.exit(0)
 
@@ -6,13 +6,25 @@ Three specialized agents:
 2. Options Position Sizer - Calculate optimal contract quantity
 3. Options Portfolio Manager - Portfolio-level Greeks management and rebalancing
 """
+import asyncio
+import atexit
+import functools
+import hashlib
 import json
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+import operator
+import queue
+import re
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, replace
 
 import anthropic
+import httpx
+import numpy as np
 
 from config import (
     ANTHROPIC_API_KEY,
@@ -45,11 +57,49 @@ except Exception as e:
     print(f"Warning: Could not set up file logging: {e}")
 
 
+# ============================================================================
+# RESOLVED CONFIG LIMITS
+# ============================================================================
+# OPTIONS_CONFIG / OPTIONS_SAFETY don't change while running, so the limits
+# the sizing and review paths use are resolved once here. Call
+# reload_config() after changing either dict to pick the new values up.
+
+_MAX_POSITION_PCT: float = 0.02
+_MAX_CONTRACTS: int = 10
+_MAX_OPTIONS_PCT: float = 0.10
+_MAX_SECTOR_PCT: float = 50.0
+_MAX_POSITIONS: int = 4
+_SIZER_LIMITS_TEXT: str = ""
+
+
+def reload_config():
+    """Re-read the options limits from OPTIONS_CONFIG / OPTIONS_SAFETY"""
+    global _MAX_POSITION_PCT, _MAX_CONTRACTS, _MAX_OPTIONS_PCT, _MAX_SECTOR_PCT
+    global _MAX_POSITIONS, _SIZER_LIMITS_TEXT
+
+    _MAX_POSITION_PCT = OPTIONS_CONFIG.get("position_size_pct", 0.02)
+    _MAX_CONTRACTS = OPTIONS_CONFIG.get("max_contracts_per_trade", 10)
+    _MAX_OPTIONS_PCT = OPTIONS_CONFIG.get("max_portfolio_risk_options", 0.10)
+    _MAX_SECTOR_PCT = OPTIONS_SAFETY.get("max_single_sector_pct", 50.0)
+    _MAX_POSITIONS = OPTIONS_CONFIG.get("max_options_positions", 4)
+
+    # Config-derived tail of the sizer prompt
+    _SIZER_LIMITS_TEXT = f"""- Max Sector Exposure: {OPTIONS_SAFETY.get('max_single_sector_pct', 50)}%
+
+## Risk Limits (from config)
+- Max options exposure: {_MAX_OPTIONS_PCT * 100:.0f}% of portfolio
+- Max position size: {_MAX_POSITION_PCT * 100:.0f}% of portfolio
+- Max contracts per trade: {_MAX_CONTRACTS}"""
+
+
+reload_config()
+
+
 # ============================================================================
 # DATA CLASSES FOR STRUCTURED INPUT/OUTPUT
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PositionReviewInput:
     """Input data for position review"""
     contract_symbol: str
@@ -77,7 +127,7 @@ class PositionReviewInput:
     sector: str = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionReviewResult:
     """Result from position review agent"""
     contract_symbol: str
@@ -96,7 +146,7 @@ class PositionReviewResult:
     fallback_reason: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PositionSizingInput:
     """Input data for position sizing"""
     underlying: str
@@ -126,7 +176,7 @@ class PositionSizingInput:
     signal_conviction: float = 0.5
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionSizingResult:
     """Result from position sizing agent"""
     recommended_contracts: int
@@ -145,7 +195,7 @@ class PositionSizingResult:
     fallback_reason: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PortfolioReviewInput:
     """Input data for portfolio-level review"""
     # Account state
@@ -173,7 +223,7 @@ class PortfolioReviewInput:
     positions_expiring_soon: int = 0  # Within 7 days
 
 
-@dataclass
+@dataclass(slots=True)
 class PortfolioReviewResult:
     """Result from portfolio manager agent"""
     overall_assessment: str  # 'healthy', 'moderate_risk', 'high_risk', 'critical'
@@ -393,75 +443,564 @@ Respond with JSON only:
 }"""
 
 
+# ============================================================================
+# RESPONSE SCHEMAS
+# ============================================================================
+# Each agent is forced to answer through a single tool whose input_schema
+# mirrors the JSON format in its system prompt, so the API hands back an
+# already-parsed dict instead of text that may be wrapped in markdown.
+
+RESPONSE_TOOL_NAME = "emit_response"
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+_CONFIDENCE = {"type": "number", "minimum": 0, "maximum": 1}
+
+POSITION_REVIEW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recommendation": {"type": "string", "enum": ["HOLD", "CLOSE", "ROLL", "TRIM"]},
+        "urgency": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
+        "reasoning": {"type": "string"},
+        "risk_factors": _STRING_LIST,
+        "roll_to_expiration": {"type": ["string", "null"]},
+        "roll_to_strike": {"type": ["number", "null"]},
+        "estimated_roll_cost": {"type": ["number", "null"]},
+        "confidence": _CONFIDENCE,
+    },
+    "required": ["recommendation", "urgency", "reasoning", "risk_factors", "confidence"],
+}
+
+POSITION_SIZING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "recommended_contracts": {"type": "integer", "minimum": 0, "maximum": 10},
+        "max_contracts": {"type": "integer", "minimum": 0},
+        "position_value": {"type": "number"},
+        "position_pct_of_portfolio": {"type": "number"},
+        "reasoning": {"type": "string"},
+        "risk_factors": _STRING_LIST,
+        "delta_impact": {"type": "number"},
+        "theta_impact": {"type": "number"},
+        "confidence": _CONFIDENCE,
+    },
+    "required": ["recommended_contracts", "max_contracts", "reasoning", "risk_factors", "confidence"],
+}
+
+PORTFOLIO_REVIEW_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overall_assessment": {"type": "string", "enum": ["healthy", "moderate_risk", "high_risk", "critical"]},
+        "risk_score": {"type": "integer", "minimum": 0, "maximum": 100},
+        "recommendations": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "action": {"type": "string"},
+                    "priority": {"type": "string", "enum": ["high", "medium", "low"]},
+                    "symbol": {"type": "string"},
+                },
+            },
+        },
+        "rebalancing_needed": {"type": "boolean"},
+        "rebalancing_actions": _STRING_LIST,
+        "roll_suggestions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "contract": {"type": "string"},
+                    "roll_to": {"type": "string"},
+                    "reason": {"type": "string"},
+                },
+            },
+        },
+        "risk_factors": _STRING_LIST,
+        "summary": {"type": "string"},
+        "confidence": _CONFIDENCE,
+    },
+    "required": ["overall_assessment", "risk_score", "rebalancing_needed", "summary", "confidence"],
+}
+
+FLOW_VALIDATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "results": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "signal_id": {"type": "string"},
+                    "symbol": {"type": "string"},
+                    "recommendation": {"type": "string", "enum": ["EXECUTE", "ALERT", "SKIP"]},
+                    "conviction": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "conviction_breakdown": {"type": "string"},
+                    "thesis": {"type": "string"},
+                    "risk_factors": _STRING_LIST,
+                    "suggested_contracts": {"type": "integer", "minimum": 0, "maximum": 3},
+                    "profit_target": {"type": "string"},
+                    "stop_loss": {"type": "string"},
+                },
+                "required": ["signal_id", "symbol", "recommendation", "conviction", "thesis", "risk_factors"],
+            },
+        },
+    },
+    "required": ["results"],
+}
+
+
+# ============================================================================
+# AGENT RESPONSE CACHE
+# ============================================================================
+# Agent answers are reused for AGENT_CACHE_TTL_SECONDS. Lookups try the
+# exact prompt (SHA-256 of system + user prompt) first, then an optional
+# coarse feature key so positions in the same DTE / P&L / Greeks / VIX
+# buckets share one answer. Entries live in memory and are mirrored to
+# SQLite so a restart doesn't throw them away.
+
+AGENT_CACHE_TTL_SECONDS = 15 * 60
+
+
+class AgentResponseCache:
+    """Thread-safe TTL cache of parsed agent responses with a SQLite mirror"""
+
+    def __init__(self, ttl_seconds: int = AGENT_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    @staticmethod
+    def prompt_key(system_prompt: str, user_prompt: str) -> str:
+        return hashlib.sha256(f"{system_prompt}\0{user_prompt}".encode()).hexdigest()
+
+    @staticmethod
+    def feature_key(agent_name: str, features: tuple) -> str:
+        return f"{agent_name}:" + hashlib.sha256(repr(features).encode()).hexdigest()
+
+    def _ensure_table(self, conn):
+        if self._table_ready:
+            return
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS options_agent_cache (
+                cache_key TEXT PRIMARY KEY,
+                agent_name TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._table_ready = True
+
+    def get(self, *keys: str) -> Optional[Dict]:
+        """Return the first fresh response stored under any of keys"""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry and now - entry[0] < self.ttl_seconds:
+                    return entry[1]
+
+        try:
+            from db import pool
+            with pool.checkout() as conn:
+                self._ensure_table(conn)
+                for key in keys:
+                    row = conn.execute(
+                        "SELECT response, created_at FROM options_agent_cache WHERE cache_key = ? AND created_at > ?",
+                        (key, now - self.ttl_seconds)
+                    ).fetchone()
+                    if row:
+                        response = json.loads(row["response"])
+                        with self._lock:
+                            self._entries[key] = (row["created_at"], response)
+                        return response
+        except Exception as e:
+            logger.warning(f"Agent cache lookup failed: {e}")
+        return None
+
+    def put(self, agent_name: str, response: Dict, *keys: str):
+        """Store response under every key"""
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                self._entries[key] = (now, response)
+
+        try:
+            from db import pool
+            with pool.writer() as conn:
+                self._ensure_table(conn)
+                payload = json.dumps(response)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO options_agent_cache (cache_key, agent_name, response, created_at) VALUES (?, ?, ?, ?)",
+                    [(key, agent_name, payload, now) for key in keys]
+                )
+        except Exception as e:
+            logger.warning(f"Agent cache write failed: {e}")
+
+
+agent_cache = AgentResponseCache()
+
+
+def _review_cache_features(position: PositionReviewInput) -> tuple:
+    """
+    Bucketed PositionReviewer inputs that drive the recommendation.
+
+    The contract (underlying, strike, expiration) is part of the key: the
+    reply carries roll targets and ticker-specific reasoning, so it is only
+    reused for the same contract.
+    """
+    return (
+        position.underlying,
+        position.strike,
+        position.expiration,
+        position.option_type,
+        position.days_to_expiry,
+        round(position.unrealized_plpc, 2),
+        round(position.delta, 2),
+        round(position.theta),
+        int(position.vix_level // 5),
+        position.sector,
+    )
+
+
 # ============================================================================
 # AGENT CLIENT
 # ============================================================================
 
+# Roll suggestions target an expiration this many days out
+ROLL_TARGET_DAYS = 28
+
+# Directional sign of a long option by type; anything that is not a call is
+# treated as a put, as before. Extend here for spreads/multi-leg types.
+_SIGN_BY_TYPE = {"call": 1, "put": -1}
+
+# Concurrent position reviews, and the cap on in-flight API calls across
+# threads (keeps parallel reviews under the Anthropic rate limit)
+REVIEW_MAX_WORKERS = 8
+AGENT_MAX_CONCURRENT_CALLS = 5
+_agent_call_slots = threading.BoundedSemaphore(AGENT_MAX_CONCURRENT_CALLS)
+
+# Positions the rules can decide without the agent: expiring (DTE <= 1),
+# past the 50% stop, or a 40%+ move either way with DTE <= 3
+SHORT_CIRCUIT_MAX_LOSS = -0.5
+SHORT_CIRCUIT_LOW_DTE_MOVE = 0.4
+SHORT_CIRCUIT_CONFIDENCE = 0.9
+
+# review_positions_batch submits one Message Batch per review cycle; it
+# polls with backoff up to this interval and falls back to rules for
+# anything unanswered after the timeout
+REVIEW_BATCH_POLL_MAX_SECONDS = 30
+REVIEW_BATCH_TIMEOUT_SECONDS = 600
+
+# Model behind every agent call unless a caller picks another tier
+AGENT_MODEL = "claude-sonnet-4-20250514"
+
+# Shared HTTP pool for the agent client; the SDK retries 429/overloaded/5xx
+# (not other 4xx) with jittered exponential backoff, honouring retry-after,
+# up to AGENT_MAX_RETRIES times, and each retry is logged as a warning
+AGENT_MAX_RETRIES = 2
+AGENT_KEEPALIVE_CONNECTIONS = 16
+AGENT_MAX_CONNECTIONS = 32
+AGENT_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+class _SDKRetryLogFilter(logging.Filter):
+    """
+    Re-log the SDK's retry notices (INFO on its own logger) as agent warnings.
+
+    The original record is dropped so each retry is logged once.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.msg, str) and record.msg.startswith("Retrying request"):
+            logger.warning("[Agent] Transient API error (429/overloaded/5xx): %s", record.getMessage())
+            return False
+        return True
+
+
+# The filter only sees records at the logger's effective level, so pin it to
+# INFO rather than inherit a WARNING root level that would hide the retries
+_sdk_logger = logging.getLogger("anthropic._base_client")
+_sdk_logger.setLevel(logging.INFO)
+_sdk_logger.addFilter(_SDKRetryLogFilter())
+
+_agent_client: Optional[anthropic.Anthropic] = None
+_agent_client_lock = threading.Lock()
+
+
 def get_agent_client() -> Optional[anthropic.Anthropic]:
-    """Initialize Anthropic client with error handling"""
+    """
+    Shared Anthropic client with error handling.
+
+    Created once so every agent call reuses the same keep-alive connection
+    pool instead of paying a TCP+TLS handshake per request. Only a working
+    client is kept, so a failed init is retried on the next call.
+    """
+    global _agent_client
+    if _agent_client is not None:
+        return _agent_client
     if not ANTHROPIC_API_KEY:
         logger.warning("ANTHROPIC_API_KEY not configured")
         return None
+    with _agent_client_lock:
+        if _agent_client is None:
+            _agent_client = _create_agent_client()
+    return _agent_client
+
+
+def _create_agent_client() -> Optional[anthropic.Anthropic]:
+    """Build the shared client (bounded keep-alive pool, SDK retries)"""
     try:
-        return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+        return anthropic.Anthropic(
+            api_key=ANTHROPIC_API_KEY,
+            max_retries=AGENT_MAX_RETRIES,
+            http_client=anthropic.DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_keepalive_connections=AGENT_KEEPALIVE_CONNECTIONS,
+                    max_connections=AGENT_MAX_CONNECTIONS,
+                ),
+                timeout=AGENT_HTTP_TIMEOUT,
+            ),
+        )
     except Exception as e:
         logger.error(f"Failed to initialize Anthropic client: {e}")
         return None
 
 
+def get_async_agent_client() -> Optional[anthropic.AsyncAnthropic]:
+    """Initialize async Anthropic client with error handling"""
+    if not ANTHROPIC_API_KEY:
+        logger.warning("ANTHROPIC_API_KEY not configured")
+        return None
+    try:
+        return anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, max_retries=AGENT_MAX_RETRIES)
+    except Exception as e:
+        logger.error(f"Failed to initialize async Anthropic client: {e}")
+        return None
+
+
+def _build_agent_request(
+    system_prompt: str,
+    user_prompt: str,
+    agent_name: str,
+    max_tokens: int,
+    output_schema: Optional[Dict],
+    model: str = AGENT_MODEL
+) -> Dict:
+    """
+    Build messages.create kwargs, forcing the response tool if a schema is given.
+
+    The system prompt is static per agent, so it is marked as a prompt-cache
+    breakpoint: the tools + system prefix is billed at the cached-read rate
+    on repeat calls within the cache lifetime.
+    """
+    request = {
+        "model": model,
+        "max_tokens": max_tokens,
+        "system": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{"role": "user", "content": user_prompt}],
+    }
+    if output_schema is not None:
+        request["tools"] = [{
+            "name": RESPONSE_TOOL_NAME,
+            "description": f"Return the {agent_name} decision as structured data",
+            "input_schema": output_schema,
+        }]
+        request["tool_choice"] = {"type": "tool", "name": RESPONSE_TOOL_NAME}
+    return request
+
+
+# JSON object/array inside a markdown fence (optional json tag), even with
+# prose before or after it
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\[.*\]|\{.*\})\s*```", re.S)
+
+
+def _parse_agent_response(
+    response,
+    agent_name: str,
+    output_schema: Optional[Dict]
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """Extract the structured tool input, or parse the text reply as JSON"""
+    if output_schema is not None:
+        tool_use = next((block for block in response.content if block.type == "tool_use"), None)
+        if tool_use is None:
+            error_msg = "Agent response did not include structured output"
+            logger.error(f"[{agent_name}] {error_msg}")
+            return None, error_msg
+        logger.info("[%s] Agent structured response received", agent_name)
+        return tool_use.input, None
+
+    response_text = response.content[0].text
+    logger.debug("[%s] Raw response: %.500s...", agent_name, response_text)
+
+    # Unwrap a markdown fence if present (JSONDecodeError is reported by the caller)
+    fenced = _FENCE_RE.search(response_text)
+    parsed = json.loads(fenced.group(1) if fenced else response_text)
+    logger.info("[%s] Agent response parsed successfully", agent_name)
+    return parsed, None
+
+
+def _agent_cache_keys(
+    system_prompt: str,
+    user_prompt: str,
+    agent_name: str,
+    cache_features: Optional[tuple]
+) -> List[str]:
+    """Exact-prompt key first, then the bucketed feature key if given"""
+    keys = [AgentResponseCache.prompt_key(system_prompt, user_prompt)]
+    if cache_features is not None:
+        keys.append(AgentResponseCache.feature_key(agent_name, cache_features))
+    return keys
+
+
+def _agent_error(agent_name: str, e: Exception) -> Tuple[None, str]:
+    """Log and describe an agent call failure"""
+    if isinstance(e, json.JSONDecodeError):
+        error_msg = f"Failed to parse agent response as JSON: {e}"
+    elif isinstance(e, anthropic.APIError):
+        error_msg = f"Anthropic API error: {e}"
+    else:
+        error_msg = f"Unexpected error calling agent: {e}"
+    logger.error(f"[{agent_name}] {error_msg}")
+    return None, error_msg
+
+
 def call_agent(
     system_prompt: str,
     user_prompt: str,
     agent_name: str,
-    max_tokens: int = 1024
+    max_tokens: int = 1024,
+    output_schema: Optional[Dict] = None,
+    cache_features: Optional[tuple] = None
 ) -> Tuple[Optional[Dict], Optional[str]]:
     """
     Call Claude agent with error handling and logging.
 
+    With output_schema, the model is forced to reply via a tool whose input
+    matches the schema and the structured tool input is returned as-is.
+    Without it, the text reply is parsed as JSON (markdown fences stripped).
+
+    Responses are served from agent_cache when the same prompt (or, with
+    cache_features, the same bucketed inputs) was answered within the TTL.
+
     Returns:
         Tuple of (parsed_response, error_message)
     """
+    cache_keys = _agent_cache_keys(system_prompt, user_prompt, agent_name, cache_features)
+    cached = agent_cache.get(*cache_keys)
+    if cached is not None:
+        logger.info("[%s] Using cached agent response", agent_name)
+        return cached, None
+
     client = get_agent_client()
     if not client:
         return None, "Agent client not available"
 
-    logger.info(f"[{agent_name}] Calling agent...")
+    logger.info("[%s] Calling agent...", agent_name)
 
     try:
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=max_tokens,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_prompt}]
-        )
+        with _agent_call_slots:
+            response = client.messages.create(
+                **_build_agent_request(system_prompt, user_prompt, agent_name, max_tokens, output_schema)
+            )
+        parsed, error = _parse_agent_response(response, agent_name, output_schema)
+    except Exception as e:
+        return _agent_error(agent_name, e)
 
-        response_text = response.content[0].text.strip()
-        logger.debug(f"[{agent_name}] Raw response: {response_text[:500]}...")
+    if parsed is not None:
+        agent_cache.put(agent_name, parsed, *cache_keys)
+    return parsed, error
 
-        # Clean up response if wrapped in markdown
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-        response_text = response_text.strip()
 
-        # Parse JSON
-        parsed = json.loads(response_text)
-        logger.info(f"[{agent_name}] Agent response parsed successfully")
-        return parsed, None
+async def call_agent_async(
+    system_prompt: str,
+    user_prompt: str,
+    agent_name: str,
+    max_tokens: int = 1024,
+    output_schema: Optional[Dict] = None,
+    cache_features: Optional[tuple] = None,
+    client: Optional[anthropic.AsyncAnthropic] = None
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Async variant of call_agent using AsyncAnthropic.
 
-    except json.JSONDecodeError as e:
-        error_msg = f"Failed to parse agent response as JSON: {e}"
-        logger.error(f"[{agent_name}] {error_msg}")
-        return None, error_msg
-    except anthropic.APIError as e:
-        error_msg = f"Anthropic API error: {e}"
-        logger.error(f"[{agent_name}] {error_msg}")
-        return None, error_msg
+    Lets independent agent calls overlap (e.g. via asyncio.gather) so a
+    batch takes roughly the slowest call instead of the sum of all calls.
+    Pass client to share one connection pool across the gathered calls (the
+    caller closes it); without one, a client is opened for this call only.
+
+    Returns:
+        Tuple of (parsed_response, error_message)
+    """
+    cache_keys = _agent_cache_keys(system_prompt, user_prompt, agent_name, cache_features)
+    cached = agent_cache.get(*cache_keys)
+    if cached is not None:
+        logger.info("[%s] Using cached agent response", agent_name)
+        return cached, None
+
+    owns_client = client is None
+    if owns_client:
+        client = get_async_agent_client()
+        if not client:
+            return None, "Agent client not available"
+
+    logger.info("[%s] Calling agent (async)...", agent_name)
+
+    try:
+        response = await client.messages.create(
+            **_build_agent_request(system_prompt, user_prompt, agent_name, max_tokens, output_schema)
+        )
+        parsed, error = _parse_agent_response(response, agent_name, output_schema)
     except Exception as e:
-        error_msg = f"Unexpected error calling agent: {e}"
-        logger.error(f"[{agent_name}] {error_msg}")
-        return None, error_msg
+        return _agent_error(agent_name, e)
+    finally:
+        if owns_client:
+            await client.close()
+
+    if parsed is not None:
+        agent_cache.put(agent_name, parsed, *cache_keys)
+    return parsed, error
+
+
+def _run_message_batch(
+    client: anthropic.Anthropic,
+    requests: Dict[str, Dict],
+    agent_name: str,
+    timeout_seconds: float,
+    poll_max_seconds: float
+) -> Optional[Dict[str, object]]:
+    """
+    Submit custom_id -> messages.create kwargs as one Message Batch and wait.
+
+    Polls with exponential backoff until the batch ends; cancels it and
+    returns None after timeout_seconds. Returns custom_id -> Message for the
+    requests that succeeded (errored/expired ones are logged and left out).
+    """
+    batch = client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": params} for custom_id, params in requests.items()
+    ])
+    logger.info(f"[{agent_name}] Submitted batch {batch.id} ({len(requests)} requests)")
+
+    delay = 1.0
+    deadline = time.monotonic() + timeout_seconds
+    while batch.processing_status != "ended":
+        if time.monotonic() >= deadline:
+            logger.warning(f"[{agent_name}] Batch {batch.id} still {batch.processing_status}, cancelling")
+            client.messages.batches.cancel(batch.id)
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, poll_max_seconds)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    messages = {}
+    for entry in client.messages.batches.results(batch.id):
+        if entry.custom_id not in requests:
+            continue
+        if entry.result.type != "succeeded":
+            logger.warning(f"[{agent_name}] Batch request {entry.custom_id} {entry.result.type}")
+            continue
+        messages[entry.custom_id] = entry.result.message
+    return messages
 
 
 # ============================================================================
@@ -482,66 +1021,227 @@ def review_position(
     Returns:
         PositionReviewResult with recommendation and reasoning
     """
-    logger.info(f"[PositionReviewer] Reviewing {position.contract_symbol}")
-    logger.info(f"  DTE: {position.days_to_expiry}, P/L: {position.unrealized_plpc:.1%}")
-    logger.info(f"  Greeks: D={position.delta:.2f}, G={position.gamma:.4f}, T=${position.theta:.2f}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[PositionReviewer] Reviewing %s", position.contract_symbol)
+        logger.info("  DTE: %s, P/L: %.1f%%", position.days_to_expiry, position.unrealized_plpc * 100)
+        logger.info("  Greeks: D=%.2f, G=%.4f, T=$%.2f", position.delta, position.gamma, position.theta)
 
-    # Try agent first if enabled
+    # Try agent first if enabled, unless the rules verdict is clear-cut
     if use_agent:
+        result = _short_circuit_review(position)
+        if result:
+            logger.info("[PositionReviewer] Clear-cut rules verdict, skipping agent: %s (%s)",
+                        result.recommendation, result.urgency)
+            return result
+
         result = _review_position_with_agent(position)
         if result:
-            logger.info(f"[PositionReviewer] Agent recommendation: {result.recommendation} ({result.urgency})")
+            logger.info("[PositionReviewer] Agent recommendation: %s (%s)", result.recommendation, result.urgency)
             return result
         logger.warning("[PositionReviewer] Agent failed, falling back to rules")
 
     # Fallback to rules-based review
     result = _review_position_rules_based(position)
-    logger.info(f"[PositionReviewer] Rules-based recommendation: {result.recommendation} ({result.urgency})")
+    logger.info("[PositionReviewer] Rules-based recommendation: %s (%s)", result.recommendation, result.urgency)
     return result
 
 
 def _review_position_with_agent(position: PositionReviewInput) -> Optional[PositionReviewResult]:
     """Use Claude agent to review position"""
+    response, error = call_agent(
+        system_prompt=POSITION_REVIEWER_PROMPT,
+        user_prompt=_build_review_prompt(position),
+        agent_name="PositionReviewer",
+        output_schema=POSITION_REVIEW_SCHEMA,
+        cache_features=_review_cache_features(position)
+    )
+
+    if error or not response:
+        return None
+
+    return _review_result_from_response(position, response)
+
+
+async def review_position_async(
+    position: PositionReviewInput,
+    use_agent: bool = True,
+    client: Optional[anthropic.AsyncAnthropic] = None
+) -> PositionReviewResult:
+    """Async variant of review_position; falls back to rules the same way"""
+    if use_agent:
+        result = _short_circuit_review(position)
+        if result:
+            logger.info("[PositionReviewer] %s clear-cut rules verdict, skipping agent: %s (%s)",
+                        position.contract_symbol, result.recommendation, result.urgency)
+            return result
+
+        response, error = await call_agent_async(
+            system_prompt=POSITION_REVIEWER_PROMPT,
+            user_prompt=_build_review_prompt(position),
+            agent_name="PositionReviewer",
+            output_schema=POSITION_REVIEW_SCHEMA,
+            cache_features=_review_cache_features(position),
+            client=client
+        )
+        if response and not error:
+            result = _review_result_from_response(position, response)
+            logger.info("[PositionReviewer] %s agent recommendation: %s (%s)",
+                        position.contract_symbol, result.recommendation, result.urgency)
+            return result
+        logger.warning(f"[PositionReviewer] Agent failed for {position.contract_symbol}, falling back to rules")
+
+    result = _review_position_rules_based(position)
+    logger.info("[PositionReviewer] %s rules-based recommendation: %s (%s)",
+                position.contract_symbol, result.recommendation, result.urgency)
+    return result
+
+
+async def review_all(
+    positions: List[PositionReviewInput],
+    use_agent: bool = True
+) -> List[PositionReviewResult]:
+    """
+    Review many positions with overlapping agent calls.
+
+    Results come back in the same order as positions; all calls share one
+    AsyncAnthropic client, closed when they finish. Run from sync code
+    with asyncio.run(review_all(...)).
+    """
+    client = get_async_agent_client() if use_agent and positions else None
+    try:
+        return list(await asyncio.gather(
+            *(review_position_async(position, use_agent=use_agent, client=client) for position in positions)
+        ))
+    finally:
+        if client:
+            await client.close()
+
+
+def review_positions_batch(
+    positions: List[PositionReviewInput],
+    use_agent: bool = True
+) -> List[PositionReviewResult]:
+    """
+    Review many positions with a single Message Batches submission.
 
-    # Build prompt with position details
-    user_prompt = f"""Review this options position:
+    Clear-cut and cached positions are answered locally; every other
+    position is one batch request (custom_id per position, half price), so
+    a review cycle is one submission instead of a round-trip per position.
+    Positions the batch doesn't answer fall back to rules. Results come back
+    in the same order as positions.
+
+    The batch completes asynchronously (minutes, not seconds), so use
+    review_all when the answers are needed right away.
+    """
+    results: List[Optional[PositionReviewResult]] = [None] * len(positions)
+
+    if use_agent:
+        # custom_id must be short and alphanumeric, so key requests by position
+        requests = {}
+        pending = {}
+        for i, position in enumerate(positions):
+            result = _short_circuit_review(position)
+            if result:
+                results[i] = result
+                continue
+
+            user_prompt = _build_review_prompt(position)
+            cache_keys = _agent_cache_keys(
+                POSITION_REVIEWER_PROMPT, user_prompt, "PositionReviewer", _review_cache_features(position)
+            )
+            cached = agent_cache.get(*cache_keys)
+            if cached is not None:
+                results[i] = _review_result_from_response(position, cached)
+                continue
+
+            custom_id = f"position-{i}"
+            pending[custom_id] = (i, cache_keys)
+            requests[custom_id] = _build_agent_request(
+                POSITION_REVIEWER_PROMPT, user_prompt, "PositionReviewer", 1024, POSITION_REVIEW_SCHEMA
+            )
+
+        logger.info("[PositionReviewer] Batch review: %d positions, %d answered locally, %d submitted",
+                    len(positions), len(positions) - len(requests), len(requests))
+
+        if requests:
+            for custom_id, response in _review_batch_responses(requests).items():
+                i, cache_keys = pending[custom_id]
+                agent_cache.put("PositionReviewer", response, *cache_keys)
+                results[i] = _review_result_from_response(positions[i], response)
+
+    fallbacks = 0
+    for i, position in enumerate(positions):
+        if results[i] is None:
+            results[i] = _review_position_rules_based(position)
+            fallbacks += 1
+    if use_agent and fallbacks:
+        logger.warning("[PositionReviewer] %d positions fell back to rules-based review", fallbacks)
+    return results
+
+
+def _review_batch_responses(requests: Dict[str, Dict]) -> Dict[str, Dict]:
+    """Run the review requests as one Message Batch; custom_id -> structured reply"""
+    client = get_agent_client()
+    if not client:
+        return {}
+
+    try:
+        messages = _run_message_batch(
+            client, requests, "PositionReviewer", REVIEW_BATCH_TIMEOUT_SECONDS, REVIEW_BATCH_POLL_MAX_SECONDS
+        )
+    except Exception as e:
+        logger.exception(f"[PositionReviewer] Batch error: {e}")
+        return {}
+    if messages is None:
+        return {}
+
+    responses = {}
+    for custom_id, message in messages.items():
+        response, error = _parse_agent_response(message, "PositionReviewer", POSITION_REVIEW_SCHEMA)
+        if response and not error:
+            responses[custom_id] = response
+    return responses
+
+
+# Agent user prompts are module-level templates filled with the input
+# dataclass as {p}; only the per-call values are interpolated
+_POSITION_REVIEW_TEMPLATE = """Review this options position:
 
 ## Position Details
-- Contract: {position.contract_symbol}
-- Underlying: {position.underlying} @ ${position.underlying_price:.2f}
-- Type: {position.option_type.upper()} ${position.strike}
-- Expiration: {position.expiration}
-- Days to Expiry: {position.days_to_expiry}
-- Quantity: {position.quantity} contracts
+- Contract: {p.contract_symbol}
+- Underlying: {p.underlying} @ ${p.underlying_price:.2f}
+- Type: {option_type} ${p.strike}
+- Expiration: {p.expiration}
+- Days to Expiry: {p.days_to_expiry}
+- Quantity: {p.quantity} contracts
 
 ## P/L Status
-- Entry Price: ${position.avg_entry_price:.2f}
-- Current Price: ${position.current_price:.2f}
-- Unrealized P/L: ${position.unrealized_pl:.2f} ({position.unrealized_plpc:.1%})
+- Entry Price: ${p.avg_entry_price:.2f}
+- Current Price: ${p.current_price:.2f}
+- Unrealized P/L: ${p.unrealized_pl:.2f} ({p.unrealized_plpc:.1%})
 
 ## Greeks (per contract)
-- Delta: {position.delta:.3f}
-- Gamma: {position.gamma:.5f}
-- Theta: ${position.theta:.2f}/day
-- Vega: {position.vega:.3f}
-- IV: {position.iv:.1%}
+- Delta: {p.delta:.3f}
+- Gamma: {p.gamma:.5f}
+- Theta: ${p.theta:.2f}/day
+- Vega: {p.vega:.3f}
+- IV: {p.iv:.1%}
 
 ## Market Context
-- SPY 1D Change: {position.spy_change_1d:+.1%}
-- VIX Level: {position.vix_level:.1f}
-- Sector: {position.sector}
+- SPY 1D Change: {p.spy_change_1d:+.1%}
+- VIX Level: {p.vix_level:.1f}
+- Sector: {p.sector}
 
 Provide your recommendation with detailed reasoning."""
 
-    response, error = call_agent(
-        system_prompt=POSITION_REVIEWER_PROMPT,
-        user_prompt=user_prompt,
-        agent_name="PositionReviewer"
-    )
 
-    if error or not response:
-        return None
+def _build_review_prompt(position: PositionReviewInput) -> str:
+    """Build the PositionReviewer user prompt"""
+    return _POSITION_REVIEW_TEMPLATE.format(p=position, option_type=position.option_type.upper())
+
 
+def _review_result_from_response(position: PositionReviewInput, response: Dict) -> PositionReviewResult:
+    """Map a PositionReviewer response onto PositionReviewResult"""
     return PositionReviewResult(
         contract_symbol=position.contract_symbol,
         recommendation=response.get("recommendation", "HOLD"),
@@ -557,6 +1257,42 @@ Provide your recommendation with detailed reasoning."""
     )
 
 
+def _roll_date(offset_days: int = ROLL_TARGET_DAYS) -> str:
+    """Target roll expiration (YYYY-MM-DD), offset_days from today"""
+    return _roll_date_from(date.today().toordinal(), offset_days)
+
+
+@functools.lru_cache(maxsize=8)
+def _roll_date_from(today_ordinal: int, offset_days: int) -> str:
+    # Keyed on today's ordinal so the cached string rolls over at midnight
+    return date.fromordinal(today_ordinal + offset_days).isoformat()
+
+
+def _is_clear_cut_review(position: PositionReviewInput) -> bool:
+    """Cases where the rules verdict (CLOSE) is certain enough to skip the agent"""
+    dte = position.days_to_expiry
+    pnl_pct = position.unrealized_plpc
+    return (
+        dte <= 1  # expiring
+        or pnl_pct <= SHORT_CIRCUIT_MAX_LOSS  # past the stop
+        or (dte <= 3 and abs(pnl_pct) >= SHORT_CIRCUIT_LOW_DTE_MOVE)  # decisive move near expiry
+    )
+
+
+def _short_circuit_review(position: PositionReviewInput) -> Optional[PositionReviewResult]:
+    """Rules-based result for clear-cut positions (logged for savings analysis), else None"""
+    if not _is_clear_cut_review(position):
+        return None
+
+    result = replace(
+        _review_position_rules_based(position),
+        confidence=SHORT_CIRCUIT_CONFIDENCE,
+        fallback_reason="high_confidence_rule_short_circuit"
+    )
+    log_agent_decision("PositionReviewer", asdict(position), asdict(result))
+    return result
+
+
 def _review_position_rules_based(position: PositionReviewInput) -> PositionReviewResult:
     """Rules-based position review (fallback)"""
 
@@ -592,7 +1328,7 @@ def _review_position_rules_based(position: PositionReviewInput) -> PositionRevie
             reasoning_parts.append(f"Significant loss ({pnl_pct:.1%}) with low DTE - cut losses")
         else:
             recommendation = "ROLL"
-            roll_to_exp = (datetime.now() + timedelta(days=28)).strftime("%Y-%m-%d")
+            roll_to_exp = _roll_date()
             reasoning_parts.append(f"DTE={dte} but position not decisive - consider rolling to {roll_to_exp}")
 
     elif dte <= 7:
@@ -604,7 +1340,7 @@ def _review_position_rules_based(position: PositionReviewInput) -> PositionRevie
             reasoning_parts.append(f"Excellent profit ({pnl_pct:.1%}) - book gains")
         elif pnl_pct >= 0.2:
             recommendation = "ROLL"
-            roll_to_exp = (datetime.now() + timedelta(days=28)).strftime("%Y-%m-%d")
+            roll_to_exp = _roll_date()
             reasoning_parts.append(f"Good profit ({pnl_pct:.1%}) but theta accelerating - consider rolling")
 
     # Loss management
@@ -664,9 +1400,10 @@ def calculate_position_size(
     Returns:
         PositionSizingResult with recommended contracts and reasoning
     """
-    logger.info(f"[PositionSizer] Sizing {sizing_input.underlying} {sizing_input.option_type} ${sizing_input.strike}")
-    logger.info(f"  Option price: ${sizing_input.option_price:.2f}, Signal score: {sizing_input.signal_score}")
-    logger.info(f"  Portfolio: ${sizing_input.account_equity:,.0f}, Options exposure: {sizing_input.current_options_exposure / sizing_input.account_equity:.1%}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("[PositionSizer] Sizing %s %s $%s", sizing_input.underlying, sizing_input.option_type, sizing_input.strike)
+        logger.info("  Option price: $%.2f, Signal score: %s", sizing_input.option_price, sizing_input.signal_score)
+        logger.info(f"  Portfolio: ${sizing_input.account_equity:,.0f}, Options exposure: {sizing_input.current_options_exposure / sizing_input.account_equity:.1%}")
 
     # Try agent first if enabled
     if use_agent:
@@ -682,51 +1419,57 @@ def calculate_position_size(
     return result
 
 
-def _calculate_size_with_agent(sizing_input: PositionSizingInput) -> Optional[PositionSizingResult]:
-    """Use Claude agent to calculate position size"""
-
-    user_prompt = f"""Calculate optimal position size for this options trade:
+_SIZER_TEMPLATE = """Calculate optimal position size for this options trade:
 
 ## Trade Details
-- Underlying: {sizing_input.underlying} @ ${sizing_input.underlying_price:.2f}
-- Option: {sizing_input.option_type.upper()} ${sizing_input.strike}
-- Expiration: {sizing_input.expiration}
-- Option Price: ${sizing_input.option_price:.2f}
-- ATR (14): ${sizing_input.underlying_atr:.2f}
-- IV Rank: {sizing_input.underlying_iv_rank:.0f}%
+- Underlying: {p.underlying} @ ${p.underlying_price:.2f}
+- Option: {option_type} ${p.strike}
+- Expiration: {p.expiration}
+- Option Price: ${p.option_price:.2f}
+- ATR (14): ${p.underlying_atr:.2f}
+- IV Rank: {p.underlying_iv_rank:.0f}%
 
 ## Signal Quality
-- Signal Score: {sizing_input.signal_score}/20
-- Conviction: {sizing_input.signal_conviction:.0%}
+- Signal Score: {p.signal_score}/20
+- Conviction: {p.signal_conviction:.0%}
 
 ## Portfolio State
-- Account Equity: ${sizing_input.account_equity:,.0f}
-- Cash Available: ${sizing_input.cash_available:,.0f}
-- Current Options Exposure: ${sizing_input.current_options_exposure:,.0f} ({sizing_input.current_options_exposure / sizing_input.account_equity * 100:.1f}%)
-- Open Options Positions: {sizing_input.current_positions_count}
+- Account Equity: ${p.account_equity:,.0f}
+- Cash Available: ${p.cash_available:,.0f}
+- Current Options Exposure: ${p.current_options_exposure:,.0f} ({exposure_pct:.1f}%)
+- Open Options Positions: {p.current_positions_count}
 
 ## Current Portfolio Greeks
-- Net Delta: {sizing_input.portfolio_delta:.1f}
-- Total Gamma: {sizing_input.portfolio_gamma:.4f}
-- Daily Theta: ${sizing_input.portfolio_theta:.2f}
-- Total Vega: {sizing_input.portfolio_vega:.2f}
+- Net Delta: {p.portfolio_delta:.1f}
+- Total Gamma: {p.portfolio_gamma:.4f}
+- Daily Theta: ${p.portfolio_theta:.2f}
+- Total Vega: {p.portfolio_vega:.2f}
 
 ## Sector Exposure
-- Sector: {sizing_input.sector}
-- Current Sector Exposure: {sizing_input.sector_exposure_pct:.1f}%
-- Max Sector Exposure: {OPTIONS_SAFETY.get('max_single_sector_pct', 50)}%
-
-## Risk Limits (from config)
-- Max options exposure: {OPTIONS_CONFIG.get('max_portfolio_risk_options', 0.10) * 100:.0f}% of portfolio
-- Max position size: {OPTIONS_CONFIG.get('position_size_pct', 0.02) * 100:.0f}% of portfolio
-- Max contracts per trade: {OPTIONS_CONFIG.get('max_contracts_per_trade', 10)}
+- Sector: {p.sector}
+- Current Sector Exposure: {p.sector_exposure_pct:.1f}%
+{limits}
 
 Calculate the optimal number of contracts considering risk limits and portfolio Greeks."""
 
+
+def _calculate_size_with_agent(sizing_input: PositionSizingInput) -> Optional[PositionSizingResult]:
+    """Use Claude agent to calculate position size"""
+
+    user_prompt = _SIZER_TEMPLATE.format(
+        p=sizing_input,
+        option_type=sizing_input.option_type.upper(),
+        exposure_pct=sizing_input.current_options_exposure / sizing_input.account_equity * 100,
+        limits=_SIZER_LIMITS_TEXT
+    )
+
+    # Exact-prompt cache only: the count depends on cash, exposure and Greeks
+    # that a bucketed feature key would blur, and it isn't clamped afterwards
     response, error = call_agent(
         system_prompt=POSITION_SIZER_PROMPT,
         user_prompt=user_prompt,
-        agent_name="PositionSizer"
+        agent_name="PositionSizer",
+        output_schema=POSITION_SIZING_SCHEMA
     )
 
     if error or not response:
@@ -751,92 +1494,145 @@ Calculate the optimal number of contracts considering risk limits and portfolio
     )
 
 
-def _calculate_size_rules_based(sizing_input: PositionSizingInput) -> PositionSizingResult:
-    """Rules-based position sizing (fallback)"""
+# Rules-based sizing signal tiers: (min score, multiplier, reasoning); scores
+# below every tier are weak (-50%), the rest average
+_SIGNAL_TIERS = (
+    (15, 1.5, "High conviction signal ({score}/20): +50%"),
+    (12, 1.25, "Good signal ({score}/20): +25%"),
+)
+_WEAK_SIGNAL_SCORE = 8
+
+
+@functools.lru_cache(maxsize=4096)
+def _size_core(
+    equity: float,
+    option_price: float,
+    signal_score: int,
+    sector_exposure_pct: float,
+    current_options_exposure: float,
+    max_position_pct: float,
+    max_contracts: int,
+    max_sector_pct: float,
+    max_options_pct: float
+) -> Tuple[int, int, bool, bool, Optional[float]]:
+    """
+    Arithmetic core of rules-based sizing, memoized for backtests/sweeps.
 
-    equity = sizing_input.account_equity
-    option_price = sizing_input.option_price
+    The config limits are part of the key, so reload_config() needs no
+    invalidation. Returns (contracts, signal tier index, capped,
+    sector_reduced, new exposure pct if the options limit was hit).
+    """
     contract_value = option_price * 100  # Options are 100 shares
-
-    risk_factors = []
-    reasoning_parts = []
-
-    # Base position size from config
-    max_position_pct = OPTIONS_CONFIG.get("position_size_pct", 0.02)
     max_position_value = equity * max_position_pct
     base_contracts = int(max_position_value / contract_value) if contract_value > 0 else 1
 
-    reasoning_parts.append(f"Base: {max_position_pct:.0%} of ${equity:,.0f} = ${max_position_value:,.0f}")
-
     # Adjustment for signal quality
-    signal_score = sizing_input.signal_score
-    if signal_score >= 15:
-        multiplier = 1.5
-        reasoning_parts.append(f"High conviction signal ({signal_score}/20): +50%")
-    elif signal_score >= 12:
-        multiplier = 1.25
-        reasoning_parts.append(f"Good signal ({signal_score}/20): +25%")
-    elif signal_score < 8:
-        multiplier = 0.5
-        reasoning_parts.append(f"Weak signal ({signal_score}/20): -50%")
-        risk_factors.append("Low signal score")
+    tier = next((i for i, (min_score, _, _) in enumerate(_SIGNAL_TIERS) if signal_score >= min_score), None)
+    if tier is not None:
+        multiplier = _SIGNAL_TIERS[tier][1]
+    elif signal_score < _WEAK_SIGNAL_SCORE:
+        tier, multiplier = len(_SIGNAL_TIERS), 0.5
     else:
-        multiplier = 1.0
-        reasoning_parts.append(f"Average signal ({signal_score}/20): no adjustment")
+        tier, multiplier = len(_SIGNAL_TIERS) + 1, 1.0
 
     adjusted_contracts = int(base_contracts * multiplier)
 
     # Cap by max contracts config
-    max_contracts = OPTIONS_CONFIG.get("max_contracts_per_trade", 10)
-    if adjusted_contracts > max_contracts:
+    capped = adjusted_contracts > max_contracts
+    if capped:
         adjusted_contracts = max_contracts
-        reasoning_parts.append(f"Capped at max {max_contracts} contracts")
 
     # Check sector concentration
-    max_sector_pct = OPTIONS_SAFETY.get("max_single_sector_pct", 50.0)
-    if sizing_input.sector_exposure_pct > max_sector_pct * 0.7:  # >70% of limit
+    sector_reduced = sector_exposure_pct > max_sector_pct * 0.7  # >70% of limit
+    if sector_reduced:
         adjusted_contracts = max(1, adjusted_contracts // 2)
-        risk_factors.append(f"Sector concentration: {sizing_input.sector_exposure_pct:.0f}% in {sizing_input.sector}")
-        reasoning_parts.append("Reduced for sector concentration")
 
     # Check total options exposure
-    max_options_pct = OPTIONS_CONFIG.get("max_portfolio_risk_options", 0.10)
-    current_exposure_pct = sizing_input.current_options_exposure / equity
-    new_exposure = sizing_input.current_options_exposure + (adjusted_contracts * contract_value)
+    new_exposure = current_options_exposure + (adjusted_contracts * contract_value)
     new_exposure_pct = new_exposure / equity
-
+    exposure_breach = None
     if new_exposure_pct > max_options_pct:
         # Reduce to fit within limit
-        available = (equity * max_options_pct) - sizing_input.current_options_exposure
+        available = (equity * max_options_pct) - current_options_exposure
         adjusted_contracts = max(1, int(available / contract_value))
-        risk_factors.append(f"Options exposure limit: {new_exposure_pct:.1%} > {max_options_pct:.0%}")
-        reasoning_parts.append(f"Reduced to stay within {max_options_pct:.0%} options limit")
+        exposure_breach = new_exposure_pct
 
     # Ensure at least 1 contract
-    adjusted_contracts = max(1, adjusted_contracts)
-
-    # Calculate final values
-    position_value = adjusted_contracts * contract_value
-    position_pct = position_value / equity * 100
+    return max(1, adjusted_contracts), tier, capped, sector_reduced, exposure_breach
 
-    # Estimate Greeks impact (rough approximation)
-    # Assume delta ~0.5 for ATM options
-    delta_impact = adjusted_contracts * 100 * 0.5 * (1 if sizing_input.option_type == 'call' else -1)
-    theta_impact = adjusted_contracts * contract_value * 0.02  # ~2% daily decay estimate
 
-    return PositionSizingResult(
-        recommended_contracts=adjusted_contracts,
-        max_contracts=max_contracts,
-        position_value=position_value,
-        position_pct_of_portfolio=position_pct,
-        reasoning=" | ".join(reasoning_parts),
-        risk_factors=risk_factors,
-        delta_impact=delta_impact,
-        theta_impact=theta_impact,
-        confidence=0.7,
-        agent_used=False,
-        fallback_reason="Agent not used or unavailable"
-    )
+def _calculate_size_rules_based(sizing_input: PositionSizingInput) -> PositionSizingResult:
+    """Rules-based position sizing (fallback)"""
+
+    equity = sizing_input.account_equity
+    option_price = sizing_input.option_price
+    contract_value = option_price * 100  # Options are 100 shares
+
+    risk_factors = []
+    reasoning_parts = []
+
+    max_position_pct = _MAX_POSITION_PCT
+    max_contracts = _MAX_CONTRACTS
+    max_options_pct = _MAX_OPTIONS_PCT
+    signal_score = sizing_input.signal_score
+
+    adjusted_contracts, tier, capped, sector_reduced, exposure_breach = _size_core(
+        equity,
+        option_price,
+        signal_score,
+        sizing_input.sector_exposure_pct,
+        sizing_input.current_options_exposure,
+        max_position_pct,
+        max_contracts,
+        _MAX_SECTOR_PCT,
+        max_options_pct
+    )
+
+    # Base position size from config
+    reasoning_parts.append(f"Base: {max_position_pct:.0%} of ${equity:,.0f} = ${equity * max_position_pct:,.0f}")
+
+    # Adjustment for signal quality
+    if tier < len(_SIGNAL_TIERS):
+        reasoning_parts.append(_SIGNAL_TIERS[tier][2].format(score=signal_score))
+    elif tier == len(_SIGNAL_TIERS):
+        reasoning_parts.append(f"Weak signal ({signal_score}/20): -50%")
+        risk_factors.append("Low signal score")
+    else:
+        reasoning_parts.append(f"Average signal ({signal_score}/20): no adjustment")
+
+    if capped:
+        reasoning_parts.append(f"Capped at max {max_contracts} contracts")
+
+    if sector_reduced:
+        risk_factors.append(f"Sector concentration: {sizing_input.sector_exposure_pct:.0f}% in {sizing_input.sector}")
+        reasoning_parts.append("Reduced for sector concentration")
+
+    if exposure_breach is not None:
+        risk_factors.append(f"Options exposure limit: {exposure_breach:.1%} > {max_options_pct:.0%}")
+        reasoning_parts.append(f"Reduced to stay within {max_options_pct:.0%} options limit")
+
+    # Calculate final values
+    position_value = adjusted_contracts * contract_value
+    position_pct = position_value / equity * 100
+
+    # Estimate Greeks impact (rough approximation)
+    # Assume delta ~0.5 for ATM options
+    delta_impact = adjusted_contracts * 100 * 0.5 * _SIGN_BY_TYPE.get(sizing_input.option_type, -1)
+    theta_impact = adjusted_contracts * contract_value * 0.02  # ~2% daily decay estimate
+
+    return PositionSizingResult(
+        recommended_contracts=adjusted_contracts,
+        max_contracts=max_contracts,
+        position_value=position_value,
+        position_pct_of_portfolio=position_pct,
+        reasoning=" | ".join(reasoning_parts),
+        risk_factors=risk_factors,
+        delta_impact=delta_impact,
+        theta_impact=theta_impact,
+        confidence=0.7,
+        agent_used=False,
+        fallback_reason="Agent not used or unavailable"
+    )
 
 
 # ============================================================================
@@ -858,77 +1654,96 @@ def review_portfolio(
         PortfolioReviewResult with assessment and recommendations
     """
     logger.info("[PortfolioManager] Reviewing options portfolio...")
-    logger.info(f"  Equity: ${portfolio_input.account_equity:,.0f}, Options: ${portfolio_input.options_exposure:,.0f} ({portfolio_input.options_exposure_pct:.1f}%)")
-    logger.info(f"  Greeks: Delta={portfolio_input.net_delta:.1f}, Theta=${portfolio_input.daily_theta:.2f}/day")
-    logger.info(f"  Positions: {len(portfolio_input.positions)}, Expiring <7d: {portfolio_input.positions_expiring_soon}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"  Equity: ${portfolio_input.account_equity:,.0f}, Options: ${portfolio_input.options_exposure:,.0f} ({portfolio_input.options_exposure_pct:.1f}%)")
+        logger.info("  Greeks: Delta=%.1f, Theta=$%.2f/day", portfolio_input.net_delta, portfolio_input.daily_theta)
+        logger.info("  Positions: %d, Expiring <7d: %s", len(portfolio_input.positions), portfolio_input.positions_expiring_soon)
 
     # Try agent first if enabled
     if use_agent:
         result = _review_portfolio_with_agent(portfolio_input)
         if result:
-            logger.info(f"[PortfolioManager] Agent assessment: {result.overall_assessment} (risk score: {result.risk_score})")
+            logger.info("[PortfolioManager] Agent assessment: %s (risk score: %s)", result.overall_assessment, result.risk_score)
             return result
         logger.warning("[PortfolioManager] Agent failed, falling back to rules")
 
     # Fallback to rules-based review
     result = _review_portfolio_rules_based(portfolio_input)
-    logger.info(f"[PortfolioManager] Rules-based assessment: {result.overall_assessment} (risk score: {result.risk_score})")
+    logger.info("[PortfolioManager] Rules-based assessment: %s (risk score: %s)", result.overall_assessment, result.risk_score)
     return result
 
 
-def _review_portfolio_with_agent(portfolio_input: PortfolioReviewInput) -> Optional[PortfolioReviewResult]:
-    """Use Claude agent to review portfolio"""
-
-    # Format positions for prompt
-    positions_text = ""
-    for i, pos in enumerate(portfolio_input.positions[:10]):  # Limit to 10 for prompt size
-        positions_text += f"""
-Position {i+1}: {pos.get('symbol', 'N/A')}
-  - Contract: {pos.get('contract_symbol', 'N/A')}
-  - Type: {pos.get('option_type', 'N/A')} ${pos.get('strike', 0)}
-  - DTE: {pos.get('days_to_expiry', 'N/A')}
-  - P/L: {pos.get('unrealized_plpc', 0):.1%}
-  - Delta: {pos.get('delta', 0):.2f}, Theta: ${pos.get('theta', 0):.2f}
-"""
-
-    # Format sector allocation
-    sector_text = "\n".join([f"  - {k}: {v:.1f}%" for k, v in portfolio_input.sector_allocation.items()])
-
-    user_prompt = f"""Review this options portfolio:
+_PORTFOLIO_TEMPLATE = """Review this options portfolio:
 
 ## Account Overview
-- Total Equity: ${portfolio_input.account_equity:,.0f}
-- Cash Available: ${portfolio_input.cash_available:,.0f}
-- Options Exposure: ${portfolio_input.options_exposure:,.0f} ({portfolio_input.options_exposure_pct:.1f}%)
-- Max Single Position: {portfolio_input.max_single_position_pct:.1f}% of options
+- Total Equity: ${p.account_equity:,.0f}
+- Cash Available: ${p.cash_available:,.0f}
+- Options Exposure: ${p.options_exposure:,.0f} ({p.options_exposure_pct:.1f}%)
+- Max Single Position: {p.max_single_position_pct:.1f}% of options
 
 ## Aggregate Greeks
-- Net Delta: {portfolio_input.net_delta:.1f} (share equivalents)
-- Total Gamma: {portfolio_input.total_gamma:.4f}
-- Daily Theta: ${portfolio_input.daily_theta:.2f}
-- Total Vega: {portfolio_input.total_vega:.2f}
+- Net Delta: {p.net_delta:.1f} (share equivalents)
+- Total Gamma: {p.total_gamma:.4f}
+- Daily Theta: ${p.daily_theta:.2f}
+- Total Vega: {p.total_vega:.2f}
 
 ## Market Context
-- SPY: ${portfolio_input.spy_price:.2f}
-- SPY 1D: {portfolio_input.spy_change_1d:+.1%}
-- SPY 5D: {portfolio_input.spy_change_5d:+.1%}
-- VIX: {portfolio_input.vix_level:.1f}
+- SPY: ${p.spy_price:.2f}
+- SPY 1D: {p.spy_change_1d:+.1%}
+- SPY 5D: {p.spy_change_5d:+.1%}
+- VIX: {p.vix_level:.1f}
 
 ## Sector Allocation
 {sector_text}
 
-## Positions ({len(portfolio_input.positions)} total, {portfolio_input.positions_expiring_soon} expiring <7 days)
+## Positions ({n_positions} total, {p.positions_expiring_soon} expiring <7 days)
 {positions_text}
 
 Provide comprehensive portfolio assessment with specific recommendations."""
 
-    response, error = call_agent(
-        system_prompt=PORTFOLIO_MANAGER_PROMPT,
-        user_prompt=user_prompt,
-        agent_name="PortfolioManager",
-        max_tokens=2048
+# Per-position block of the portfolio prompt; the leading/trailing newlines
+# leave a blank line between joined positions so each is its own prompt block
+_PORTFOLIO_POSITION_TEMPLATE = (
+    "\nPosition {index}: {symbol}\n"
+    "  - Contract: {contract_symbol}\n"
+    "  - Type: {option_type} ${strike}\n"
+    "  - DTE: {days_to_expiry}\n"
+    "  - P/L: {unrealized_plpc:.1%}\n"
+    "  - Delta: {delta:.2f}, Theta: ${theta:.2f}\n"
+)
+_PORTFOLIO_POSITION_DEFAULTS = {
+    "symbol": "N/A",
+    "contract_symbol": "N/A",
+    "option_type": "N/A",
+    "strike": 0,
+    "days_to_expiry": "N/A",
+    "unrealized_plpc": 0,
+    "delta": 0,
+    "theta": 0,
+}
+
+
+def _review_portfolio_with_agent(portfolio_input: PortfolioReviewInput) -> Optional[PortfolioReviewResult]:
+    """Use Claude agent to review portfolio"""
+
+    # Format positions for prompt (limit to 10 for prompt size)
+    positions_text = "".join(
+        _PORTFOLIO_POSITION_TEMPLATE.format_map({**_PORTFOLIO_POSITION_DEFAULTS, **pos, "index": i})
+        for i, pos in enumerate(portfolio_input.positions[:10], 1)
     )
 
+    # Format sector allocation
+    sector_text = "\n".join([f"  - {k}: {v:.1f}%" for k, v in portfolio_input.sector_allocation.items()])
+
+    user_prompt = _PORTFOLIO_TEMPLATE.format(
+        p=portfolio_input,
+        n_positions=len(portfolio_input.positions),
+        sector_text=sector_text,
+        positions_text=positions_text
+    )
+
+    response, error = _cache_aware_portfolio_review(user_prompt)
+
     if error or not response:
         return None
 
@@ -947,6 +1762,264 @@ Provide comprehensive portfolio assessment with specific recommendations."""
     )
 
 
+# Incremental ("delta") portfolio reviews: the portfolio prompt is split
+# into blocks (sections and per-position entries). When most blocks match
+# the last reviewed prompt, only the changed blocks are sent along with the
+# prior verdict instead of the full ~2k-token portfolio.
+PORTFOLIO_DELTA_MIN_OVERLAP = 0.8
+PORTFOLIO_FULL_REVIEW_MAX_AGE_SECONDS = 60 * 60
+PORTFOLIO_SESSION_KEY = "PortfolioManager"
+
+PORTFOLIO_DELTA_PROMPT = """Your previous assessment of this options portfolio was:
+{prior}
+
+Since then, only these parts of the portfolio changed. New or updated parts:
+{changed}
+
+Earlier parts that were removed or replaced and no longer apply:
+{removed}
+
+Return the complete, updated assessment reflecting these changes."""
+
+_portfolio_sessions: Dict[str, Dict] = {}
+_portfolio_sessions_lock = threading.Lock()
+
+
+def _prompt_blocks(prompt: str) -> List[str]:
+    """Split a prompt into its blank-line separated blocks"""
+    return [block.strip() for block in prompt.split("\n\n") if block.strip()]
+
+
+def _block_hash(block: str) -> str:
+    return hashlib.sha256(block.encode()).hexdigest()
+
+
+def _load_portfolio_session(session_key: str) -> Optional[Dict]:
+    """Get session state from memory, falling back to the SQLite copy"""
+    with _portfolio_sessions_lock:
+        if session_key in _portfolio_sessions:
+            return _portfolio_sessions[session_key]
+
+    session = None
+    try:
+        from db import pool
+        with pool.checkout() as conn:
+            _ensure_portfolio_session_table(conn)
+            row = conn.execute(
+                "SELECT blocks, response, full_review_at FROM options_agent_sessions WHERE session_key = ?",
+                (session_key,)
+            ).fetchone()
+        if row:
+            session = {
+                "blocks": json.loads(row["blocks"]),
+                "response": json.loads(row["response"]),
+                "full_review_at": row["full_review_at"],
+            }
+    except Exception as e:
+        logger.warning(f"Failed to load portfolio review session: {e}")
+
+    with _portfolio_sessions_lock:
+        _portfolio_sessions[session_key] = session
+    return session
+
+
+def _save_portfolio_session(session_key: str, session: Dict):
+    """Keep session state in memory and persist it alongside options_agent_logs"""
+    with _portfolio_sessions_lock:
+        _portfolio_sessions[session_key] = session
+
+    try:
+        from db import pool
+        with pool.writer() as conn:
+            _ensure_portfolio_session_table(conn)
+            conn.execute("""
+                INSERT OR REPLACE INTO options_agent_sessions
+                (session_key, blocks, response, full_review_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                session_key,
+                json.dumps(session["blocks"]),
+                json.dumps(session["response"]),
+                session["full_review_at"],
+                time.time()
+            ))
+    except Exception as e:
+        logger.warning(f"Failed to save portfolio review session: {e}")
+
+
+def _ensure_portfolio_session_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS options_agent_sessions (
+            session_key TEXT PRIMARY KEY,
+            blocks TEXT NOT NULL,
+            response TEXT NOT NULL,
+            full_review_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+
+def _cache_aware_portfolio_review(
+    user_prompt: str,
+    session_key: str = PORTFOLIO_SESSION_KEY
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Route a portfolio review to the cheapest evaluation that's still valid.
+
+    1. Exact prompt seen within the TTL -> agent_cache hit inside call_agent
+    2. Block overlap with the last review >= PORTFOLIO_DELTA_MIN_OVERLAP ->
+       send the new, updated and removed blocks plus the prior verdict
+    3. Otherwise (or when the last full review is stale) -> full prompt
+
+    Sessions written before block text was stored hold only hashes; they
+    never overlap and so fall through to a full review.
+    """
+    blocks = _prompt_blocks(user_prompt)
+    hashes = [_block_hash(block) for block in blocks]
+    session = _load_portfolio_session(session_key)
+
+    mode = "full"
+    if session and time.time() - session["full_review_at"] < PORTFOLIO_FULL_REVIEW_MAX_AGE_SECONDS:
+        previous = {_block_hash(block): block for block in session["blocks"]}
+        current = set(hashes)
+        union = current | previous.keys()
+        overlap = len(current & previous.keys()) / len(union) if union else 1.0
+        changed = [block for block, h in zip(blocks, hashes) if h not in previous]
+        removed = [block for h, block in previous.items() if h not in current]
+        if overlap >= PORTFOLIO_DELTA_MIN_OVERLAP and (changed or removed):
+            mode = "delta"
+            prompt = PORTFOLIO_DELTA_PROMPT.format(
+                prior=json.dumps(session["response"], indent=2),
+                changed="\n\n".join(changed) if changed else "(none)",
+                removed="\n\n".join(removed) if removed else "(none)"
+            )
+            logger.info(f"[PortfolioManager] Incremental review: {len(changed)} of {len(blocks)} blocks changed, "
+                        f"{len(removed)} removed (overlap {overlap:.0%})")
+
+    if mode == "full":
+        prompt = user_prompt
+
+    response, error = call_agent(
+        system_prompt=PORTFOLIO_MANAGER_PROMPT,
+        user_prompt=prompt,
+        agent_name="PortfolioManager",
+        max_tokens=2048,
+        output_schema=PORTFOLIO_REVIEW_SCHEMA
+    )
+
+    if response and not error:
+        _save_portfolio_session(session_key, {
+            "blocks": blocks,
+            "response": response,
+            "full_review_at": time.time() if mode == "full" else session["full_review_at"],
+        })
+
+    return response, error
+
+
+# Rules-based portfolio risk buckets: (threshold, points), checked in order
+# with value > threshold; shared by the scalar review and the batch scorer
+THETA_PCT_POINTS = ((0.003, 20), (0.002, 12), (0.001, 5))  # daily theta / equity
+DELTA_PER_100K_POINTS = ((150, 20), (100, 12), (50, 5))  # |net delta| per $100K
+EXPIRING_SOON_POINTS = ((2, 20), (1, 12), (0, 5))  # 3+ / 2 / 1 positions <7 DTE
+SECTOR_EXPOSURE_POINTS = ((60, 20), (50, 12), (40, 5))  # largest sector %
+OPTIONS_EXPOSURE_POINTS = ((12, 15), (10, 8))  # options % of equity
+TOO_MANY_POSITIONS_POINTS = 15
+
+
+def _position_count_points() -> tuple:
+    """Position-count bucket (more than 1.5x the configured max)"""
+    return ((_MAX_POSITIONS * 1.5, TOO_MANY_POSITIONS_POINTS),)
+
+
+_itemgetter1 = operator.itemgetter(1)
+
+
+def _bucket_points(value: float, table: tuple) -> int:
+    """Points for the first bucket whose threshold value exceeds"""
+    for threshold, points in table:
+        if value > threshold:
+            return points
+    return 0
+
+
+def _bucket_points_array(values, table: tuple) -> np.ndarray:
+    """Vectorized _bucket_points; np.select takes the first true bucket like the elif chain"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.select([values > threshold for threshold, _ in table], [points for _, points in table], default=0)
+
+
+def score_portfolio_batch(
+    daily_theta,
+    equity,
+    net_delta,
+    positions_expiring_soon,
+    max_sector_exposure,
+    n_positions,
+    options_exposure_pct
+) -> np.ndarray:
+    """
+    Rules-based risk score (0-100) for many portfolio scenarios at once.
+
+    Each argument is an array (or scalar) over scenarios, e.g. from a stress
+    test; the score matches _review_portfolio_rules_based for each one.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    with np.errstate(divide="ignore"):
+        inv_equity = np.where(equity > 0, 1.0 / equity, 0.0)
+    daily_theta_pct = np.abs(daily_theta) * inv_equity
+    delta_per_100k = np.abs(net_delta) * (inv_equity * 100000.0)
+
+    score = (
+        _bucket_points_array(daily_theta_pct, THETA_PCT_POINTS)
+        + _bucket_points_array(delta_per_100k, DELTA_PER_100K_POINTS)
+        + _bucket_points_array(positions_expiring_soon, EXPIRING_SOON_POINTS)
+        + _bucket_points_array(max_sector_exposure, SECTOR_EXPOSURE_POINTS)
+        + _bucket_points_array(n_positions, _position_count_points())
+        + _bucket_points_array(options_exposure_pct, OPTIONS_EXPOSURE_POINTS)
+    )
+    return score.astype(np.int32)
+
+
+def _positions_to_soa(positions: List[Dict]) -> Dict[str, np.ndarray]:
+    """Column arrays (dte, pnl, contract) for a list of position dicts, built in one pass"""
+    rows = [
+        (pos.get('days_to_expiry', 999), pos.get('unrealized_plpc', 0), pos.get('contract_symbol', 'N/A'))
+        for pos in positions
+    ]
+    dte, pnl, contract = zip(*rows)
+    return {
+        "dte": np.array(dte, dtype=np.int64),
+        "pnl": np.array(pnl, dtype=np.float64),
+        "contract": np.array(contract, dtype=object),
+    }
+
+
+def aggregate_portfolio(positions: List[Dict], equity: float = 0.0) -> Dict[str, float]:
+    """
+    Portfolio totals from position dicts, reduced as NumPy columns.
+
+    Greeks must already be scaled by quantity; missing values count as 0.
+    Keys match get_portfolio_greeks (net_delta, total_gamma, daily_theta,
+    total_vega) plus options_exposure / options_exposure_pct of equity, so
+    the result feeds PortfolioReviewInput / FlowValidationInput directly.
+    """
+    n = len(positions)
+    columns = {
+        key: np.fromiter((pos.get(key) or 0 for pos in positions), dtype=np.float64, count=n)
+        for key in ("delta", "gamma", "theta", "vega", "market_value")
+    }
+    options_exposure = float(columns["market_value"].sum())
+    return {
+        "net_delta": float(columns["delta"].sum()),
+        "total_gamma": float(columns["gamma"].sum()),
+        "daily_theta": float(columns["theta"].sum()),
+        "total_vega": float(columns["vega"].sum()),
+        "options_exposure": options_exposure,
+        "options_exposure_pct": options_exposure / equity * 100 if equity > 0 else 0.0,
+    }
+
+
 def _review_portfolio_rules_based(portfolio_input: PortfolioReviewInput) -> PortfolioReviewResult:
     """Rules-based portfolio review (fallback)"""
 
@@ -957,77 +2030,71 @@ def _review_portfolio_rules_based(portfolio_input: PortfolioReviewInput) -> Port
     rebalancing_actions = []
     roll_suggestions = []
 
+    # One reciprocal shared by the equity-relative ratios (0 for empty accounts)
+    inv_equity = 1.0 / equity if equity > 0 else 0.0
+    inv_per_100k = inv_equity * 100000.0
+
     # 1. Theta decay check (0-20 points)
-    daily_theta_pct = abs(portfolio_input.daily_theta) / equity if equity > 0 else 0
-    if daily_theta_pct > 0.003:  # >0.3% daily decay
-        risk_score += 20
+    daily_theta_pct = abs(portfolio_input.daily_theta) * inv_equity
+    theta_points = _bucket_points(daily_theta_pct, THETA_PCT_POINTS)
+    risk_score += theta_points
+    if theta_points == 20:  # >0.3% daily decay
         risk_factors.append(f"Very high theta decay: ${portfolio_input.daily_theta:.0f}/day ({daily_theta_pct:.2%})")
-    elif daily_theta_pct > 0.002:
-        risk_score += 12
+    elif theta_points == 12:
         risk_factors.append(f"High theta decay: ${portfolio_input.daily_theta:.0f}/day")
-    elif daily_theta_pct > 0.001:
-        risk_score += 5
 
     # 2. Delta imbalance check (0-20 points)
-    delta_per_100k = abs(portfolio_input.net_delta) / (equity / 100000) if equity > 0 else 0
-    if delta_per_100k > 150:
-        risk_score += 20
+    delta_per_100k = abs(portfolio_input.net_delta) * inv_per_100k
+    delta_points = _bucket_points(delta_per_100k, DELTA_PER_100K_POINTS)
+    risk_score += delta_points
+    if delta_points == 20:
         risk_factors.append(f"Very high delta exposure: {portfolio_input.net_delta:.0f}")
         rebalancing_actions.append(f"Reduce delta exposure (currently {portfolio_input.net_delta:.0f})")
-    elif delta_per_100k > 100:
-        risk_score += 12
+    elif delta_points == 12:
         risk_factors.append(f"High delta exposure: {portfolio_input.net_delta:.0f}")
-    elif delta_per_100k > 50:
-        risk_score += 5
 
     # 3. Expiration risk (0-20 points)
-    if portfolio_input.positions_expiring_soon >= 3:
-        risk_score += 20
+    expiring_points = _bucket_points(portfolio_input.positions_expiring_soon, EXPIRING_SOON_POINTS)
+    risk_score += expiring_points
+    if expiring_points == 20:
         risk_factors.append(f"{portfolio_input.positions_expiring_soon} positions expiring within 7 days")
         recommendations.append({
             "action": "Review all positions expiring soon",
             "priority": "high",
             "symbol": "MULTIPLE"
         })
-    elif portfolio_input.positions_expiring_soon >= 2:
-        risk_score += 12
-    elif portfolio_input.positions_expiring_soon >= 1:
-        risk_score += 5
 
     # 4. Concentration risk (0-20 points)
-    max_sector_exposure = max(portfolio_input.sector_allocation.values()) if portfolio_input.sector_allocation else 0
-    if max_sector_exposure > 60:
-        risk_score += 20
-        top_sector = max(portfolio_input.sector_allocation, key=portfolio_input.sector_allocation.get)
+    if portfolio_input.sector_allocation:
+        top_sector, max_sector_exposure = max(portfolio_input.sector_allocation.items(), key=_itemgetter1)
+    else:
+        top_sector, max_sector_exposure = None, 0
+    sector_points = _bucket_points(max_sector_exposure, SECTOR_EXPOSURE_POINTS)
+    risk_score += sector_points
+    if sector_points == 20:
         risk_factors.append(f"Over-concentration: {max_sector_exposure:.0f}% in {top_sector}")
         rebalancing_actions.append(f"Reduce {top_sector} exposure")
-    elif max_sector_exposure > 50:
-        risk_score += 12
-    elif max_sector_exposure > 40:
-        risk_score += 5
 
     # 5. Position count / exposure check (0-20 points)
-    max_positions = OPTIONS_CONFIG.get("max_options_positions", 4)
-    if len(portfolio_input.positions) > max_positions * 1.5:
-        risk_score += 15
+    if _bucket_points(len(portfolio_input.positions), _position_count_points()):
+        risk_score += TOO_MANY_POSITIONS_POINTS
         risk_factors.append(f"Too many positions: {len(portfolio_input.positions)}")
 
-    if portfolio_input.options_exposure_pct > 12:
-        risk_score += 15
+    exposure_points = _bucket_points(portfolio_input.options_exposure_pct, OPTIONS_EXPOSURE_POINTS)
+    risk_score += exposure_points
+    if exposure_points == 15:
         risk_factors.append(f"High options exposure: {portfolio_input.options_exposure_pct:.1f}%")
-    elif portfolio_input.options_exposure_pct > 10:
-        risk_score += 8
-
-    # Generate roll suggestions for positions <7 DTE
-    for pos in portfolio_input.positions:
-        dte = pos.get('days_to_expiry', 999)
-        pnl = pos.get('unrealized_plpc', 0)
-        if dte <= 7 and pnl > -0.3:  # Not a big loser
-            roll_date = (datetime.now() + timedelta(days=28)).strftime("%Y-%m-%d")
+
+    # Generate roll suggestions for positions <7 DTE that aren't big losers
+    if portfolio_input.positions:
+        soa = _positions_to_soa(portfolio_input.positions)
+        rollable = (soa["dte"] <= 7) & (soa["pnl"] > -0.3)
+        roll_date = _roll_date()
+        for i in np.flatnonzero(rollable):
             roll_suggestions.append({
-                "contract": pos.get('contract_symbol', 'N/A'),
+                "contract": soa["contract"][i],
                 "roll_to": roll_date,
-                "reason": f"DTE={dte}, P/L={pnl:.1%}"
+                "reason": f"DTE={soa['dte'][i]}, P/L={soa['pnl'][i]:.1%}"
             })
 
     # Determine overall assessment
@@ -1074,6 +2141,9 @@ def review_all_positions(
     """
     Review all open options positions.
 
+    Reviews run concurrently (each is mostly waiting on the agent API);
+    results are returned in the same order as positions.
+
     Args:
         positions: List of position dictionaries (from options_executor.get_options_positions)
         market_context: Optional dict with spy_change_1d, vix_level
@@ -1082,53 +2152,113 @@ def review_all_positions(
     Returns:
         List of PositionReviewResult for each position
     """
+    return list(iter_review_all_positions(positions, market_context, use_agent=use_agent))
+
+
+def iter_review_all_positions(
+    positions: List[Dict],
+    market_context: Dict = None,
+    use_agent: bool = True,
+    ordered: bool = True
+) -> Iterator[PositionReviewResult]:
+    """
+    Review positions concurrently, yielding each result as it is ready.
+
+    Lets callers write/report results while later reviews are still in
+    flight. With ordered=False results come in completion order instead
+    of position order. Closing the generator early cancels reviews that
+    have not started.
+    """
+    if not positions:
+        return
+
     market_context = market_context or {}
-    results = []
 
-    for pos in positions:
+    with ThreadPoolExecutor(max_workers=min(REVIEW_MAX_WORKERS, len(positions))) as executor:
+        futures = [
+            executor.submit(_review_position_dict, pos, market_context, use_agent)
+            for pos in positions
+        ]
         try:
-            # Build input from position dict
-            review_input = PositionReviewInput(
-                contract_symbol=pos.get('contract_symbol', ''),
-                underlying=pos.get('symbol', ''),
-                option_type=pos.get('option_type', 'call'),
-                strike=pos.get('strike', 0),
-                expiration=pos.get('expiration', ''),
-                quantity=pos.get('quantity', 0),
-                avg_entry_price=pos.get('avg_entry_price', 0),
-                current_price=pos.get('current_price', 0),
-                unrealized_pl=pos.get('unrealized_pl', 0),
-                unrealized_plpc=pos.get('unrealized_plpc', 0),
-                delta=pos.get('delta', 0),
-                gamma=pos.get('gamma', 0),
-                theta=pos.get('theta', 0),
-                vega=pos.get('vega', 0),
-                iv=pos.get('iv', 0.3),
-                underlying_price=pos.get('underlying_price', pos.get('strike', 100)),
-                days_to_expiry=pos.get('days_to_expiry', 30),
-                spy_change_1d=market_context.get('spy_change_1d', 0),
-                vix_level=market_context.get('vix_level', 15),
-                sector=pos.get('sector', 'unknown')
-            )
+            for future in (futures if ordered else as_completed(futures)):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
 
-            result = review_position(review_input, use_agent=use_agent)
-            results.append(result)
 
-        except Exception as e:
-            logger.error(f"Error reviewing position {pos.get('contract_symbol')}: {e}")
-            # Return a default HOLD result
-            results.append(PositionReviewResult(
-                contract_symbol=pos.get('contract_symbol', 'ERROR'),
-                recommendation="HOLD",
-                urgency="low",
-                reasoning=f"Error during review: {e}",
-                risk_factors=["Review error"],
-                confidence=0,
-                agent_used=False,
-                fallback_reason=str(e)
-            ))
+def _review_position_dict(pos: Dict, market_context: Dict, use_agent: bool) -> PositionReviewResult:
+    """Review one position dict; errors become a default HOLD so one failure doesn't sink the batch"""
+    try:
+        # Build input from position dict
+        review_input = PositionReviewInput(
+            contract_symbol=pos.get('contract_symbol', ''),
+            underlying=pos.get('symbol', ''),
+            option_type=pos.get('option_type', 'call'),
+            strike=pos.get('strike', 0),
+            expiration=pos.get('expiration', ''),
+            quantity=pos.get('quantity', 0),
+            avg_entry_price=pos.get('avg_entry_price', 0),
+            current_price=pos.get('current_price', 0),
+            unrealized_pl=pos.get('unrealized_pl', 0),
+            unrealized_plpc=pos.get('unrealized_plpc', 0),
+            delta=pos.get('delta', 0),
+            gamma=pos.get('gamma', 0),
+            theta=pos.get('theta', 0),
+            vega=pos.get('vega', 0),
+            iv=pos.get('iv', 0.3),
+            underlying_price=pos.get('underlying_price', pos.get('strike', 100)),
+            days_to_expiry=pos.get('days_to_expiry', 30),
+            spy_change_1d=market_context.get('spy_change_1d', 0),
+            vix_level=market_context.get('vix_level', 15),
+            sector=pos.get('sector', 'unknown')
+        )
+
+        return review_position(review_input, use_agent=use_agent)
+
+    except Exception as e:
+        logger.error(f"Error reviewing position {pos.get('contract_symbol')}: {e}")
+        # Return a default HOLD result
+        return PositionReviewResult(
+            contract_symbol=pos.get('contract_symbol', 'ERROR'),
+            recommendation="HOLD",
+            urgency="low",
+            reasoning=f"Error during review: {e}",
+            risk_factors=["Review error"],
+            confidence=0,
+            agent_used=False,
+            fallback_reason=str(e)
+        )
+
+
+# log_agent_decision is write-behind: rows are queued and a daemon thread
+# inserts them in batches (up to AGENT_LOG_BATCH_SIZE rows or whatever
+# arrived within AGENT_LOG_FLUSH_SECONDS) with one commit per batch
+AGENT_LOG_BATCH_SIZE = 100
+AGENT_LOG_FLUSH_SECONDS = 1.0
 
-    return results
+
+def _json_default(obj):
+    """Serialize NumPy scalars/arrays that end up in agent inputs"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# One reusable compact encoder for log payloads (no per-call encoder setup,
+# no circular-reference bookkeeping)
+_agent_log_encoder = json.JSONEncoder(
+    separators=(",", ":"),
+    check_circular=False,
+    default=_json_default
+)
+
+_agent_log_queue: "queue.Queue[tuple]" = queue.Queue()
+_agent_log_writer_started = False
+_agent_log_writer_lock = threading.Lock()
+_agent_log_table_ready = False
 
 
 def log_agent_decision(
@@ -1137,55 +2267,110 @@ def log_agent_decision(
     result: Dict,
     execution_time_ms: float = 0
 ):
-    """Log agent decision to database for analysis"""
+    """Queue agent decision for logging to database for analysis"""
     try:
-        from db import get_connection
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Create table if not exists
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS options_agent_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                agent_name TEXT NOT NULL,
-                input_data TEXT,
-                output_data TEXT,
-                agent_used INTEGER,
-                fallback_reason TEXT,
-                execution_time_ms REAL,
-                confidence REAL
-            )
-        """)
-
-        cursor.execute("""
-            INSERT INTO options_agent_logs
-            (agent_name, input_data, output_data, agent_used, fallback_reason, execution_time_ms, confidence)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
+        _agent_log_queue.put((
             agent_name,
-            json.dumps(input_data),
-            json.dumps(result),
+            _agent_log_encoder.encode(input_data),
+            _agent_log_encoder.encode(result),
             1 if result.get('agent_used', False) else 0,
             result.get('fallback_reason'),
             execution_time_ms,
             result.get('confidence', 0)
         ))
-
-        conn.commit()
-        conn.close()
+        _start_agent_log_writer()
 
     except Exception as e:
         logger.error(f"Failed to log agent decision: {e}")
 
 
+def _start_agent_log_writer():
+    """Start the background log writer on first use"""
+    global _agent_log_writer_started
+    if _agent_log_writer_started:
+        return
+    with _agent_log_writer_lock:
+        if not _agent_log_writer_started:
+            threading.Thread(target=_agent_log_writer, name="agent-log-writer", daemon=True).start()
+            atexit.register(flush_agent_logs)
+            _agent_log_writer_started = True
+
+
+def _agent_log_writer():
+    """Drain the log queue in batches forever"""
+    while True:
+        batch = [_agent_log_queue.get()]
+        deadline = time.monotonic() + AGENT_LOG_FLUSH_SECONDS
+        while len(batch) < AGENT_LOG_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_agent_log_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        _write_agent_logs(batch)
+        for _ in batch:
+            _agent_log_queue.task_done()
+
+
+def _write_agent_logs(rows: List[tuple]):
+    """Insert queued agent decisions in a single transaction"""
+    global _agent_log_table_ready
+    try:
+        from db import pool
+        with pool.writer() as conn:
+            if not _agent_log_table_ready:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS options_agent_logs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+                        agent_name TEXT NOT NULL,
+                        input_data TEXT,
+                        output_data TEXT,
+                        agent_used INTEGER,
+                        fallback_reason TEXT,
+                        execution_time_ms REAL,
+                        confidence REAL
+                    )
+                """)
+                _agent_log_table_ready = True
+
+            conn.executemany("""
+                INSERT INTO options_agent_logs
+                (agent_name, input_data, output_data, agent_used, fallback_reason, execution_time_ms, confidence)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+    except Exception as e:
+        logger.error(f"Failed to log {len(rows)} agent decision(s): {e}")
+
+
+def flush_agent_logs():
+    """Write any queued agent decisions now (registered with atexit)"""
+    rows = []
+    while True:
+        try:
+            rows.append(_agent_log_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    if rows:
+        _write_agent_logs(rows)
+        for _ in rows:
+            _agent_log_queue.task_done()
+
+    # Wait for a batch the writer thread already picked up
+    _agent_log_queue.join()
+
+
 # ============================================================================
 # CLI FOR TESTING
 # ============================================================================
 
-if __name__ == "__main__":
-    import sys
-
+def _smoke(use_agent: bool = False):
+    """Run the reviewer, sizer and portfolio manager on sample inputs (Claude only if use_agent)"""
     print("=" * 60)
     print("OPTIONS AGENT MODULE - TEST")
     print("=" * 60)
@@ -1217,13 +2402,16 @@ if __name__ == "__main__":
         sector="tech"
     )
 
-    result = review_position(test_position, use_agent=True)
+    result = review_position(test_position, use_agent=use_agent)
     print(f"Recommendation: {result.recommendation}")
     print(f"Urgency: {result.urgency}")
     print(f"Reasoning: {result.reasoning}")
     print(f"Agent Used: {result.agent_used}")
     print(f"Confidence: {result.confidence:.0%}")
 
+    results = review_positions_batch([test_position], use_agent=use_agent)
+    print(f"Batch Review: {results[0].recommendation} ({results[0].urgency}), Agent Used: {results[0].agent_used}")
+
     # Test 2: Position Sizing
     print("\n[TEST 2] Position Sizing")
     print("-" * 40)
@@ -1251,7 +2439,7 @@ if __name__ == "__main__":
         signal_conviction=0.75
     )
 
-    result = calculate_position_size(test_sizing, use_agent=True)
+    result = calculate_position_size(test_sizing, use_agent=use_agent)
     print(f"Recommended Contracts: {result.recommended_contracts}")
     print(f"Position Value: ${result.position_value:,.0f}")
     print(f"Portfolio %: {result.position_pct_of_portfolio:.1f}%")
@@ -1302,7 +2490,7 @@ if __name__ == "__main__":
         positions_expiring_soon=1
     )
 
-    result = review_portfolio(test_portfolio, use_agent=True)
+    result = review_portfolio(test_portfolio, use_agent=use_agent)
     print(f"Assessment: {result.overall_assessment}")
     print(f"Risk Score: {result.risk_score}/100")
     print(f"Rebalancing Needed: {result.rebalancing_needed}")
@@ -1319,7 +2507,7 @@ if __name__ == "__main__":
 # FLOW VALIDATOR - Claude-based flow signal validation
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FlowSignalInput:
     """Input data for a single flow signal"""
     signal_id: str
@@ -1343,7 +2531,7 @@ class FlowSignalInput:
     sector: str = "unknown"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FlowValidationInput:
     """Input data for flow validation (batched signals + context)"""
     signals: List[FlowSignalInput]
@@ -1373,7 +2561,7 @@ class FlowValidationInput:
     concentration: Dict[str, float] = None  # Exposure by underlying
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FlowValidationResult:
     """Result for a single signal validation"""
     signal_id: str
@@ -1388,13 +2576,57 @@ class FlowValidationResult:
     conviction_breakdown: str = ""  # How conviction was calculated
 
 
+# With use_batch, signals go through the Message Batches API (half price,
+# validated in parallel server-side) once there are at least this many;
+# polling backs off to FLOW_BATCH_POLL_MAX_SECONDS and gives up after
+# FLOW_BATCH_TIMEOUT_SECONDS, falling back to the direct call
+FLOW_BATCH_MIN_SIGNALS = 5
+FLOW_BATCH_POLL_MAX_SECONDS = 30
+FLOW_BATCH_TIMEOUT_SECONDS = 600
+
+# With parallel, each signal is its own concurrent request (at most this many
+# in flight) so wall time is about one call and a bad reply only loses its
+# own signal
+FLOW_MAX_CONCURRENT_CALLS = 10
+
+# Signals are skipped locally, without an agent call, when the portfolio
+# cannot take a new position anyway: risk capacity under this floor (the
+# validator's own SKIP rule) or already at max positions
+FLOW_PREFILTER_MIN_RISK_CAPACITY = 0.1
+
+# With triage, a cheaper model screens signals first; only its clear SKIPs
+# (conviction <= this) are final, everything else goes to AGENT_MODEL
+FLOW_TRIAGE_MODEL = "claude-3-5-haiku-20241022"
+FLOW_TRIAGE_SKIP_CONVICTION = 30
+
+# Reply budget scales with the number of signals in the request (each
+# result carries a thesis and conviction breakdown); a truncated tool call
+# loses every signal in it, so the per-signal allowance stays generous
+FLOW_MAX_TOKENS_BASE = 300
+FLOW_MAX_TOKENS_PER_SIGNAL = 250
+FLOW_MAX_TOKENS_CAP = 4000
+
+
 def validate_flow_signals(
     validation_input: FlowValidationInput,
-    use_agent: bool = True
+    use_agent: bool = True,
+    use_batch: bool = False,
+    parallel: bool = False,
+    triage: bool = False
 ) -> List[FlowValidationResult]:
     """
     Validate flow signals using Claude AI.
 
+    use_batch trades latency for cost: large sets are validated one request
+    per signal through the Message Batches API, which completes
+    asynchronously, so leave it off in the realtime listener loop.
+
+    parallel validates each signal in its own concurrent request instead of
+    one combined prompt (more input tokens, isolated failures).
+
+    triage screens signals with FLOW_TRIAGE_MODEL first and sends only the
+    ones it can't clearly skip to the main model.
+
     Returns list of FlowValidationResult sorted by execution priority.
     """
     logger.info(f"[FlowValidator] Validating {len(validation_input.signals)} signals")
@@ -1403,58 +2635,222 @@ def validate_flow_signals(
         return []
 
     if use_agent and ANTHROPIC_API_KEY:
-        result = _validate_with_agent(validation_input)
+        skipped, validation_input = _prefilter_flow_signals(validation_input)
+        if not validation_input.signals:
+            return skipped
+
+        result = None
+        if use_batch and len(validation_input.signals) >= FLOW_BATCH_MIN_SIGNALS:
+            result = _validate_with_batch_api(validation_input)
+            if not result:
+                logger.warning("[FlowValidator] Batch validation failed, falling back to direct call")
+        if not result and parallel and len(validation_input.signals) > 1:
+            result = _validate_in_parallel(validation_input)
+            if not result:
+                logger.warning("[FlowValidator] Parallel validation failed, falling back to combined call")
+        if not result and triage:
+            result = _validate_with_triage(validation_input)
+            if not result:
+                logger.warning("[FlowValidator] Triage validation failed, falling back to combined call")
+        if not result:
+            result = _validate_with_agent(validation_input)
         if result:
-            return result
+            return result + skipped
         logger.warning("[FlowValidator] Agent failed, no fallback for flow validation")
+        if skipped:
+            return skipped
 
     # No rules-based fallback - flow validation requires Claude
     logger.warning("[FlowValidator] Skipping validation - Claude unavailable")
     return []
 
 
-def _validate_with_agent(validation_input: FlowValidationInput) -> Optional[List[FlowValidationResult]]:
-    """Use Claude to validate flow signals"""
+def _prefilter_flow_signal(
+    sig: FlowSignalInput,
+    validation_input: FlowValidationInput
+) -> Optional[FlowValidationResult]:
+    """SKIP result if local risk state already rules the signal out, else None"""
+    if validation_input.risk_capacity_pct < FLOW_PREFILTER_MIN_RISK_CAPACITY:
+        reason = f"Risk capacity {validation_input.risk_capacity_pct:.0%} below {FLOW_PREFILTER_MIN_RISK_CAPACITY:.0%}"
+    elif validation_input.position_count >= validation_input.max_positions:
+        reason = f"At max positions ({validation_input.position_count}/{validation_input.max_positions})"
+    else:
+        return None
+
+    return FlowValidationResult(
+        signal_id=sig.signal_id,
+        symbol=sig.symbol,
+        recommendation="SKIP",
+        conviction=0,
+        thesis=f"Skipped before validation: {reason}",
+        risk_factors=[reason],
+        suggested_contracts=0,
+        profit_target="50%",
+        stop_loss="50%",
+        conviction_breakdown="prefilter"
+    )
+
+
+def _prefilter_flow_signals(
+    validation_input: FlowValidationInput
+) -> Tuple[List[FlowValidationResult], FlowValidationInput]:
+    """Split off locally-skipped signals; returns (skips, input with the rest)"""
+    skipped = []
+    remaining = []
+    for sig in validation_input.signals:
+        skip = _prefilter_flow_signal(sig, validation_input)
+        if skip:
+            skipped.append(skip)
+        else:
+            remaining.append(sig)
+
+    if not skipped:
+        return skipped, validation_input
+
+    logger.info(f"[FlowValidator] Prefiltered {len(skipped)} of {len(validation_input.signals)} signals "
+                f"locally ({skipped[0].risk_factors[0]})")
+    return skipped, replace(validation_input, signals=remaining)
+
+
+FLOW_VALIDATOR_PROMPT = """You are an AUTONOMOUS OPTIONS TRADING AGENT with full decision authority.
+Your decisions are based on RISK CAPACITY and CONVICTION, not arbitrary rules.
+
+=== RISK-BASED DECISION FRAMEWORK ===
+
+You make decisions based on THREE factors:
+1. RISK CAPACITY - How much risk budget is available (provided in context)
+2. CONVICTION - Your assessment of the trade's probability of success
+3. THESIS VALIDITY - Is there a clear, logical reason for this trade
+
+There are NO hard-coded limits like "max 3 trades per day" or "hold 2 days minimum".
+Instead, you evaluate RISK vs REWARD dynamically.
+
+=== ENTRY DECISION LOGIC ===
+
+WHEN TO EXECUTE:
+- Risk capacity >= 20% AND conviction >= 80% AND thesis is clear
+- Exceptional setups (conviction >= 90%) can use up to 125% of normal risk budget
+- Trend-aligned trades require LOWER conviction than counter-trend
+
+WHEN TO SKIP:
+- Risk capacity < 10% (portfolio is at limit)
+- Conviction < 65% (not enough edge)
+- No clear thesis (just "unusual activity" is not enough)
+- IV rank > 70% without specific catalyst (expensive premium)
+
+CONVICTION FACTORS (use these to calculate your conviction score):
++15: Strong sweep activity with size
++10: Floor/institutional trade
++10: Opening position (not closing)
++10: Vol/OI > 3x (significant new positioning)
++10: Trend-aligned (calls in uptrend, puts in downtrend)
+-15: Counter-trend (requires exceptional other factors)
+-10: IV rank > 60% (expensive premium)
+-10: Near earnings without clear thesis
+-5:  DTE < 14 (elevated theta)
+-5:  OTM (lower probability)
+
+=== RISK CAPACITY RULES ===
+
+The RISK_LEVEL tells you how aggressive you can be:
+- HEALTHY (risk score 0-30): Normal operations, can take new positions
+- CAUTIOUS (31-50): Be selective, require higher conviction (+10%)
+- ELEVATED (51-70): Very selective, only exceptional setups
+- CRITICAL (71+): No new positions, focus on risk reduction
+
+=== POSITION SIZING ===
+
+Base size on conviction AND risk capacity:
+- Conviction 90%+ with healthy risk: 2-3 contracts
+- Conviction 80-89%: 1-2 contracts
+- Conviction 70-79%: 1 contract (ALERT only)
+- Lower conviction: 0 contracts (SKIP)
+
+Scale DOWN if:
+- Already exposed to same underlying
+- Same sector concentration > 30%
+- Portfolio delta already directionally loaded
+
+=== OUTPUT FORMAT ===
+
+For each signal, provide conviction score and clear thesis.
+Your thesis should explain WHY this trade has edge, not just describe the flow.
+
+Submit your verdicts through the tool, one `results` entry per signal."""
+
+# Static tail of the validator user prompt (output format reminder)
+_FLOW_TASK_FOOTER = """For each signal, provide a `results` entry with:
+{
+  "signal_id": "the ID",
+  "symbol": "TICKER",
+  "recommendation": "EXECUTE" | "ALERT" | "SKIP",
+  "conviction": 0-100,
+  "conviction_breakdown": "list factors: +15 sweep, +10 floor, -10 IV rank = 85%",
+  "thesis": "Clear thesis explaining the EDGE (not just describing the flow)",
+  "risk_factors": ["list", "of", "risks"],
+  "suggested_contracts": 0-3,
+  "profit_target": "+50%",
+  "stop_loss": "-50%"
+}
+
+REMEMBER: EXECUTE only if conviction >= 80% AND risk capacity >= 20%.
+Submit your verdicts through the tool, one `results` entry per signal."""
+
+# One signal's block of the validator prompt, filled with the signal as {p}
+_FLOW_SIGNAL_TEMPLATE = """
+Signal {i} (ID: {p.signal_id}):
+- Symbol: {p.symbol}
+- Flow: {option_type} ${p.strike} exp {p.expiration}
+- Premium: ${p.premium:,.0f}
+- Characteristics:{tags}
+- Vol/OI: {p.vol_oi_ratio:.1f}x
+- Underlying: ${p.underlying_price:.2f}
+- Sentiment: {p.sentiment}
+- Earnings: {p.days_to_earnings} days away
+- IV Rank: {iv_rank}
+- Sector: {p.sector}
+"""
+
+
+def _flow_request(
+    validation_input: FlowValidationInput,
+    signals: List[FlowSignalInput],
+    model: str = AGENT_MODEL
+) -> Dict:
+    """Build messages.create kwargs validating signals against the shared context"""
 
     # Format signals for prompt
-    signals_text = ""
-    for i, sig in enumerate(validation_input.signals, 1):
-        sweep_tag = " [SWEEP]" if sig.is_sweep else ""
-        floor_tag = " [FLOOR]" if sig.is_floor else ""
-        ask_tag = " [ASK-SIDE]" if sig.is_ask_side else ""
-        opening_tag = " [OPENING]" if sig.is_opening else ""
-        otm_tag = " [OTM]" if sig.is_otm else ""
+    sig_parts = []
+    for i, sig in enumerate(signals, 1):
+        tags = "".join(tag for flag, tag in (
+            (sig.is_sweep, " [SWEEP]"),
+            (sig.is_floor, " [FLOOR]"),
+            (sig.is_ask_side, " [ASK-SIDE]"),
+            (sig.is_opening, " [OPENING]"),
+            (sig.is_otm, " [OTM]"),
+        ) if flag)
 
         # Format IV rank with warning if high
-        iv_rank_str = f"{sig.iv_rank:.0f}" if sig.iv_rank is not None else "N/A"
-        if sig.iv_rank is not None and sig.iv_rank > 70:
-            iv_rank_str += " [HIGH - EXPENSIVE PREMIUM]"
-        elif sig.iv_rank is not None and sig.iv_rank > 50:
-            iv_rank_str += " [ELEVATED]"
-
-        signals_text += f"""
-Signal {i} (ID: {sig.signal_id}):
-- Symbol: {sig.symbol}
-- Flow: {sig.option_type.upper()} ${sig.strike} exp {sig.expiration}
-- Premium: ${sig.premium:,.0f}
-- Characteristics:{sweep_tag}{floor_tag}{ask_tag}{opening_tag}{otm_tag}
-- Vol/OI: {sig.vol_oi_ratio:.1f}x
-- Underlying: ${sig.underlying_price:.2f}
-- Sentiment: {sig.sentiment}
-- Earnings: {sig.days_to_earnings} days away
-- IV Rank: {iv_rank_str}
-- Sector: {sig.sector}
-"""
+        if sig.iv_rank is None:
+            iv_rank_str = "N/A"
+        elif sig.iv_rank > 70:
+            iv_rank_str = f"{sig.iv_rank:.0f} [HIGH - EXPENSIVE PREMIUM]"
+        elif sig.iv_rank > 50:
+            iv_rank_str = f"{sig.iv_rank:.0f} [ELEVATED]"
+        else:
+            iv_rank_str = f"{sig.iv_rank:.0f}"
 
-    # Format positions
-    positions_text = ""
-    if validation_input.options_positions:
-        for pos in validation_input.options_positions[:5]:
-            pnl = pos.get('unrealized_plpc', 0) * 100
-            emoji = "+" if pnl >= 0 else ""
-            positions_text += f"  {pos.get('symbol', 'N/A')} {pos.get('option_type', '').upper()} ${pos.get('strike', 0)} | {emoji}{pnl:.1f}% | Delta: {pos.get('delta', 0):.2f}\n"
-    else:
-        positions_text = "  (no current positions)"
+        sig_parts.append(_FLOW_SIGNAL_TEMPLATE.format(
+            i=i, p=sig, option_type=sig.option_type.upper(), tags=tags, iv_rank=iv_rank_str
+        ))
+    signals_text = "".join(sig_parts)
+
+    # Format positions (memoized: the portfolio is usually unchanged between ticks)
+    positions_text = _format_positions(tuple(
+        (pos.get('symbol', 'N/A'), pos.get('option_type', ''), pos.get('strike', 0),
+         pos.get('unrealized_plpc', 0), pos.get('delta', 0))
+        for pos in validation_input.options_positions[:5]
+    ))
 
     # Get risk level description
     risk_level = validation_input.risk_level if hasattr(validation_input, 'risk_level') else "healthy"
@@ -1508,138 +2904,225 @@ Show your work: list the positive and negative factors, then sum to get convicti
 
 Risk capacity is {risk_capacity:.0%} - {'you can take new positions' if risk_capacity > 0.2 else 'BE VERY SELECTIVE' if risk_capacity > 0.1 else 'NO NEW POSITIONS ALLOWED'}.
 
-For each signal, provide a JSON object:
-{{
-  "signal_id": "the ID",
-  "symbol": "TICKER",
-  "recommendation": "EXECUTE" | "ALERT" | "SKIP",
-  "conviction": 0-100,
-  "conviction_breakdown": "list factors: +15 sweep, +10 floor, -10 IV rank = 85%",
-  "thesis": "Clear thesis explaining the EDGE (not just describing the flow)",
-  "risk_factors": ["list", "of", "risks"],
-  "suggested_contracts": 0-3,
-  "profit_target": "+50%",
-  "stop_loss": "-50%"
-}}
+""" + _FLOW_TASK_FOOTER
 
-REMEMBER: EXECUTE only if conviction >= 80% AND risk capacity >= 20%.
-Return ONLY valid JSON array."""
+    return _build_agent_request(
+        FLOW_VALIDATOR_PROMPT, prompt, "FlowValidator", _flow_max_tokens(len(signals)), FLOW_VALIDATION_SCHEMA, model
+    )
 
-    system_prompt = """You are an AUTONOMOUS OPTIONS TRADING AGENT with full decision authority.
-Your decisions are based on RISK CAPACITY and CONVICTION, not arbitrary rules.
 
-=== RISK-BASED DECISION FRAMEWORK ===
+@functools.lru_cache(maxsize=32)
+def _format_positions(pos_key: tuple) -> str:
+    """Positions block of the validation prompt from (symbol, type, strike, plpc, delta) rows"""
+    if not pos_key:
+        return "  (no current positions)"
+    pos_parts = []
+    for symbol, option_type, strike, plpc, delta in pos_key:
+        pnl = plpc * 100
+        emoji = "+" if pnl >= 0 else ""
+        pos_parts.append(f"  {symbol} {option_type.upper()} ${strike} | {emoji}{pnl:.1f}% | Delta: {delta:.2f}\n")
+    return "".join(pos_parts)
 
-You make decisions based on THREE factors:
-1. RISK CAPACITY - How much risk budget is available (provided in context)
-2. CONVICTION - Your assessment of the trade's probability of success
-3. THESIS VALIDITY - Is there a clear, logical reason for this trade
 
-There are NO hard-coded limits like "max 3 trades per day" or "hold 2 days minimum".
-Instead, you evaluate RISK vs REWARD dynamically.
+def _flow_max_tokens(signal_count: int) -> int:
+    """max_tokens for a validation request covering signal_count signals"""
+    return min(FLOW_MAX_TOKENS_CAP, FLOW_MAX_TOKENS_BASE + FLOW_MAX_TOKENS_PER_SIGNAL * signal_count)
 
-=== ENTRY DECISION LOGIC ===
 
-WHEN TO EXECUTE:
-- Risk capacity >= 20% AND conviction >= 80% AND thesis is clear
-- Exceptional setups (conviction >= 90%) can use up to 125% of normal risk budget
-- Trend-aligned trades require LOWER conviction than counter-trend
+def _flow_results_from_response(
+    response,
+    signal: Optional[FlowSignalInput] = None
+) -> Optional[List[FlowValidationResult]]:
+    """
+    Map the structured validator reply onto FlowValidationResult objects.
 
-WHEN TO SKIP:
-- Risk capacity < 10% (portfolio is at limit)
-- Conviction < 65% (not enough edge)
-- No clear thesis (just "unusual activity" is not enough)
-- IV rank > 70% without specific catalyst (expensive premium)
+    Returns None if the reply carried no structured output. With signal (a
+    single-signal request), its id/symbol are used so the result maps back
+    even if the model echoes them wrongly.
+    """
+    results_data, error = _parse_agent_response(response, "FlowValidator", FLOW_VALIDATION_SCHEMA)
+    if error:
+        return None
 
-CONVICTION FACTORS (use these to calculate your conviction score):
-+15: Strong sweep activity with size
-+10: Floor/institutional trade
-+10: Opening position (not closing)
-+10: Vol/OI > 3x (significant new positioning)
-+10: Trend-aligned (calls in uptrend, puts in downtrend)
--15: Counter-trend (requires exceptional other factors)
--10: IV rank > 60% (expensive premium)
--10: Near earnings without clear thesis
--5:  DTE < 14 (elevated theta)
--5:  OTM (lower probability)
+    # Convert to FlowValidationResult objects
+    results = []
+    for item in results_data.get("results", []):
+        result = FlowValidationResult(
+            signal_id=signal.signal_id if signal else item.get("signal_id", ""),
+            symbol=signal.symbol if signal else item.get("symbol", ""),
+            recommendation=item.get("recommendation", "SKIP"),
+            conviction=item.get("conviction", 0),
+            thesis=item.get("thesis", ""),
+            risk_factors=item.get("risk_factors", []),
+            suggested_contracts=item.get("suggested_contracts", 0),
+            profit_target=item.get("profit_target", "50%"),
+            stop_loss=item.get("stop_loss", "50%"),
+            conviction_breakdown=item.get("conviction_breakdown", ""),
+        )
+        results.append(result)
+    return results
 
-=== RISK CAPACITY RULES ===
 
-The RISK_LEVEL tells you how aggressive you can be:
-- HEALTHY (risk score 0-30): Normal operations, can take new positions
-- CAUTIOUS (31-50): Be selective, require higher conviction (+10%)
-- ELEVATED (51-70): Very selective, only exceptional setups
-- CRITICAL (71+): No new positions, focus on risk reduction
+def _validate_with_agent(
+    validation_input: FlowValidationInput,
+    model: str = AGENT_MODEL
+) -> Optional[List[FlowValidationResult]]:
+    """Use Claude to validate flow signals"""
+    try:
+        client = get_agent_client()
+        if not client:
+            return None
+
+        # Streamed so a long multi-signal reply is read as it is generated
+        # rather than held behind one blocking read (and its read timeout)
+        request = _flow_request(validation_input, validation_input.signals, model)
+        logger.info(f"[FlowValidator] Requesting {len(validation_input.signals)} signals, max_tokens={request['max_tokens']}")
+        with client.messages.stream(**request) as stream:
+            response = stream.get_final_message()
+
+        results = _flow_results_from_response(response)
+        if results is None:
+            return None
+
+        logger.info(f"[FlowValidator] Validated {len(results)} signals ({model})")
+        for r in results:
+            logger.info(f"  {r.symbol}: {r.recommendation} ({r.conviction}%)")
 
-=== POSITION SIZING ===
+        return results
 
-Base size on conviction AND risk capacity:
-- Conviction 90%+ with healthy risk: 2-3 contracts
-- Conviction 80-89%: 1-2 contracts
-- Conviction 70-79%: 1 contract (ALERT only)
-- Lower conviction: 0 contracts (SKIP)
+    except Exception as e:
+        logger.exception(f"[FlowValidator] Error: {e}")
+        return None
 
-Scale DOWN if:
-- Already exposed to same underlying
-- Same sector concentration > 30%
-- Portfolio delta already directionally loaded
 
-=== OUTPUT FORMAT ===
+def _validate_with_triage(validation_input: FlowValidationInput) -> Optional[List[FlowValidationResult]]:
+    """
+    Two-tier cascade: a cheap triage pass, then the main model for the rest.
 
-For each signal, provide conviction score and clear thesis.
-Your thesis should explain WHY this trade has edge, not just describe the flow.
+    Triage verdicts are kept only for clear SKIPs (conviction at or below
+    FLOW_TRIAGE_SKIP_CONVICTION); anything that could lead to an alert or
+    a trade is confirmed by AGENT_MODEL. Returns None if either pass fails.
+    """
+    triaged = _validate_with_agent(validation_input, model=FLOW_TRIAGE_MODEL)
+    if triaged is None:
+        return None
+
+    signal_ids = {sig.signal_id for sig in validation_input.signals}
+    kept = {
+        r.signal_id: r for r in triaged
+        if r.signal_id in signal_ids and r.recommendation == "SKIP" and r.conviction <= FLOW_TRIAGE_SKIP_CONVICTION
+    }
+    escalate = [sig for sig in validation_input.signals if sig.signal_id not in kept]
+    logger.info(f"[FlowValidator] Triage: {len(kept)} settled on {FLOW_TRIAGE_MODEL}, "
+                f"{len(escalate)} escalated to {AGENT_MODEL}")
+
+    results = list(kept.values())
+    if escalate:
+        confirmed = _validate_with_agent(replace(validation_input, signals=escalate))
+        if confirmed is None:
+            return None
+        results = confirmed + results
+    return results
 
-Return ONLY valid JSON array, no other text."""
 
+def _validate_in_parallel(validation_input: FlowValidationInput) -> Optional[List[FlowValidationResult]]:
+    """Sync wrapper running one concurrent validation request per signal"""
     try:
-        client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+        results = asyncio.run(_validate_per_signal_async(validation_input))
+    except Exception as e:
+        logger.exception(f"[FlowValidator] Parallel validation error: {e}")
+        return None
 
-        response = client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
-            system=system_prompt,
-            messages=[{"role": "user", "content": prompt}]
+    if results:
+        logger.info(f"[FlowValidator] Validated {len(results)} of {len(validation_input.signals)} signals in parallel")
+        for r in results:
+            logger.info(f"  {r.symbol}: {r.recommendation} ({r.conviction}%)")
+    return results
+
+
+async def _validate_per_signal_async(validation_input: FlowValidationInput) -> Optional[List[FlowValidationResult]]:
+    """
+    Validate every signal concurrently, bounded by FLOW_MAX_CONCURRENT_CALLS.
+
+    The async client retries 429/5xx with backoff; a signal whose request
+    still fails (or whose reply has no structured output) is logged and
+    left out.
+    """
+    client = get_async_agent_client()
+    if not client:
+        return None
+
+    signals = validation_input.signals
+    slots = asyncio.Semaphore(FLOW_MAX_CONCURRENT_CALLS)
+
+    async with client:
+        outcomes = await asyncio.gather(
+            *(_validate_one(client, slots, validation_input, sig) for sig in signals),
+            return_exceptions=True
         )
 
-        response_text = response.content[0].text.strip()
+    results = []
+    for sig, outcome in zip(signals, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"[FlowValidator] {sig.symbol} validation failed: {outcome}")
+            continue
+        results.extend(outcome)
+    return results
+
+
+async def _validate_one(
+    client: anthropic.AsyncAnthropic,
+    slots: asyncio.Semaphore,
+    validation_input: FlowValidationInput,
+    sig: FlowSignalInput
+) -> List[FlowValidationResult]:
+    """Validate a single signal against the shared portfolio/market context"""
+    async with slots:
+        response = await client.messages.create(**_flow_request(validation_input, [sig]))
+    results = _flow_results_from_response(response, sig)
+    if results is None:
+        raise ValueError("reply carried no structured output")
+    return results
+
+
+def _validate_with_batch_api(validation_input: FlowValidationInput) -> Optional[List[FlowValidationResult]]:
+    """
+    Validate each signal as its own request through the Message Batches API.
+
+    Returns None if the batch doesn't end within FLOW_BATCH_TIMEOUT_SECONDS.
+    Signals whose request errored or returned no structured output are left
+    out of the results.
+    """
+    client = get_agent_client()
+    if not client:
+        return None
 
-        # Parse JSON response
-        # Handle potential markdown code blocks
-        if response_text.startswith("```"):
-            lines = response_text.split("\n")
-            response_text = "\n".join(lines[1:-1])
+    # custom_id must be short and alphanumeric, so key requests by position
+    signals_by_id = {f"signal-{i}": sig for i, sig in enumerate(validation_input.signals)}
 
-        results_data = json.loads(response_text)
+    try:
+        messages = _run_message_batch(
+            client,
+            {custom_id: _flow_request(validation_input, [sig]) for custom_id, sig in signals_by_id.items()},
+            "FlowValidator",
+            FLOW_BATCH_TIMEOUT_SECONDS,
+            FLOW_BATCH_POLL_MAX_SECONDS
+        )
+        if messages is None:
+            return None
 
-        # Convert to FlowValidationResult objects
         results = []
-        for item in results_data:
-            result = FlowValidationResult(
-                signal_id=item.get("signal_id", ""),
-                symbol=item.get("symbol", ""),
-                recommendation=item.get("recommendation", "SKIP"),
-                conviction=item.get("conviction", 0),
-                thesis=item.get("thesis", ""),
-                risk_factors=item.get("risk_factors", []),
-                suggested_contracts=item.get("suggested_contracts", 0),
-                profit_target=item.get("profit_target", "50%"),
-                stop_loss=item.get("stop_loss", "50%"),
-                conviction_breakdown=item.get("conviction_breakdown", ""),
-            )
-            results.append(result)
+        for custom_id, message in messages.items():
+            results.extend(_flow_results_from_response(message, signals_by_id[custom_id]) or [])
 
-        logger.info(f"[FlowValidator] Validated {len(results)} signals")
+        logger.info(f"[FlowValidator] Batch validated {len(results)} of {len(signals_by_id)} signals")
         for r in results:
             logger.info(f"  {r.symbol}: {r.recommendation} ({r.conviction}%)")
 
         return results
 
-    except json.JSONDecodeError as e:
-        logger.error(f"[FlowValidator] JSON parse error: {e}")
-        logger.error(f"[FlowValidator] Raw response: {response_text[:500]}")
-        return None
     except Exception as e:
-        logger.exception(f"[FlowValidator] Error: {e}")
+        logger.exception(f"[FlowValidator] Batch error: {e}")
         return None
 
 
@@ -1652,3 +3135,26 @@ Thesis: {result.thesis}
 Risk: {', '.join(result.risk_factors) if result.risk_factors else 'None'}
 Size: {result.suggested_contracts} contracts
 Target: {result.profit_target} | Stop: {result.stop_loss}"""
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Options agent self-test")
+    parser.add_argument(
+        "--smoke",
+        action="store_true",
+        help="Run the reviewer/sizer/portfolio smoke test (also RUN_SMOKE=1)"
+    )
+    parser.add_argument(
+        "--agent",
+        action="store_true",
+        help="Let the smoke test call Claude (default: rules-based only)"
+    )
+    args = parser.parse_args()
+
+    if args.smoke or os.getenv("RUN_SMOKE") == "1":
+        _smoke(use_agent=args.agent)
+    else:
+        parser.print_help()
@@ -1,12 +1,18 @@
 """
 Options Executor - Place and manage options orders via Alpaca
 """
+import functools
 import json
 import math
-from datetime import datetime, timedelta
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from dataclasses import dataclass
 from typing import List, Dict, Optional, Tuple
 
+import numpy as np
 from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import (
     MarketOrderRequest,
@@ -35,6 +41,48 @@ from db import (
 )
 
 
+# ============== RESOLVED CONFIG LIMITS ==============
+# OPTIONS_CONFIG doesn't change while running, so the limits used on the
+# sizing, trade and exit paths are resolved once here. Call reload_config()
+# after changing it to pick the new values up.
+
+_MAX_POSITION_VALUE: float = 2000
+_POSITION_SIZE_PCT: float = 0.02
+_DEFAULT_CONTRACTS: int = 1
+_MAX_CONTRACTS: int = 10
+_MIN_PREMIUM: float = 0.50  # per share
+_MAX_PREMIUM: float = 5.00  # per share
+_PROFIT_TARGET_PCT: float = 0.5
+_STOP_LOSS_PCT: float = 0.5
+_MAX_POSITIONS: int = 4
+_MAX_OPTIONS_PCT: float = 0.10
+_MIN_DTE: int = 14
+_MAX_DTE: int = 45
+
+
+def reload_config():
+    """Re-read the options limits from OPTIONS_CONFIG"""
+    global _MAX_POSITION_VALUE, _POSITION_SIZE_PCT, _DEFAULT_CONTRACTS, _MAX_CONTRACTS
+    global _MIN_PREMIUM, _MAX_PREMIUM, _PROFIT_TARGET_PCT, _STOP_LOSS_PCT
+    global _MAX_POSITIONS, _MAX_OPTIONS_PCT, _MIN_DTE, _MAX_DTE
+
+    _MAX_POSITION_VALUE = OPTIONS_CONFIG["max_position_value"]
+    _POSITION_SIZE_PCT = OPTIONS_CONFIG["position_size_pct"]
+    _DEFAULT_CONTRACTS = OPTIONS_CONFIG["default_contracts"]
+    _MAX_CONTRACTS = OPTIONS_CONFIG["max_contracts_per_trade"]
+    _MIN_PREMIUM = OPTIONS_CONFIG["min_premium"] / 100
+    _MAX_PREMIUM = OPTIONS_CONFIG["max_premium"] / 100
+    _PROFIT_TARGET_PCT = OPTIONS_CONFIG["profit_target_pct"]
+    _STOP_LOSS_PCT = OPTIONS_CONFIG["stop_loss_pct"]
+    _MAX_POSITIONS = OPTIONS_CONFIG["max_options_positions"]
+    _MAX_OPTIONS_PCT = OPTIONS_CONFIG["max_portfolio_risk_options"]
+    _MIN_DTE = OPTIONS_CONFIG["min_days_to_exp"]
+    _MAX_DTE = OPTIONS_CONFIG["max_days_to_exp"]
+
+
+reload_config()
+
+
 @dataclass
 class OptionsPosition:
     """Represents an options position"""
@@ -119,13 +167,70 @@ SECTOR_MAP = {
 }
 
 
+_trading_client: Optional[TradingClient] = None
+_trading_client_lock = threading.Lock()
+
+
 def get_trading_client() -> TradingClient:
-    """Initialize Alpaca trading client"""
-    return TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
+    """
+    Shared Alpaca trading client.
 
+    Created once so every call reuses the client's HTTP session (keep-alive
+    connections to the Alpaca API) instead of a fresh TLS handshake per call.
+    """
+    global _trading_client
+    if _trading_client is None:
+        with _trading_client_lock:
+            if _trading_client is None:
+                _trading_client = TradingClient(ALPACA_API_KEY, ALPACA_SECRET_KEY, paper=True)
+    return _trading_client
+
+
+# Account and position snapshots are reused for this long, so one trade
+# check or monitor cycle hits the API once instead of 3-4 times; orders
+# placed through place_options_order clear them
+SNAPSHOT_TTL_SECONDS = 3.0
+
+
+def _ttl_cache(ttl: float):
+    """
+    Memoize a no-argument API fetch for ttl seconds.
 
+    Expiry is checked lazily on each call; concurrent callers share one
+    fetch. Exceptions are not cached. fn.cache_clear() drops the snapshot.
+    Callers must treat the result as read-only.
+    """
+    def decorator(fn):
+        state = {"value": None, "fetched_at": 0.0}
+        lock = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper():
+            with lock:
+                now = time.monotonic()
+                if state["value"] is None or now - state["fetched_at"] > ttl:
+                    state["value"] = fn()
+                    state["fetched_at"] = now
+                return state["value"]
+
+        def cache_clear():
+            with lock:
+                state["value"] = None
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+def clear_snapshot_cache():
+    """Drop the cached account and positions snapshots (call after any order)"""
+    get_account_info.cache_clear()
+    _fetch_options_positions.cache_clear()
+
+
+@_ttl_cache(SNAPSHOT_TTL_SECONDS)
 def get_account_info() -> Dict:
-    """Get account information"""
+    """Get account information (cached for SNAPSHOT_TTL_SECONDS)"""
     client = get_trading_client()
     account = client.get_account()
     return {
@@ -427,7 +532,7 @@ def get_option_greeks(contract_symbol: str, underlying_price: float = None) -> P
 
     # Calculate DTE
     try:
-        exp_date = datetime.strptime(contract_info['expiration'], "%Y-%m-%d")
+        exp_date = datetime.fromisoformat(contract_info['expiration'])
         dte = max(1, (exp_date - datetime.now()).days)
     except Exception:
         dte = 30  # Default
@@ -607,9 +712,8 @@ def can_add_position(symbol: str, estimated_value: float = None) -> Tuple[bool,
         return False, f"Sector {sector} already at {current_sector_pct:.0f}% (limit {max_sector_pct:.0f}%)"
 
     # Check if already have position in this underlying
-    for pos in positions:
-        if pos.symbol == symbol:
-            return False, f"Already have position in {symbol}"
+    if symbol in get_options_positions_by_underlying():
+        return False, f"Already have position in {symbol}"
 
     # Check underlying concentration
     total_value = sum(abs(p.market_value) for p in positions)
@@ -639,7 +743,7 @@ def check_expiration_risk() -> List[Dict]:
 
     for pos in positions:
         try:
-            exp_date = datetime.strptime(pos.expiration, "%Y-%m-%d")
+            exp_date = datetime.fromisoformat(pos.expiration)
             dte = (exp_date - datetime.now()).days
 
             alert = None
@@ -845,7 +949,7 @@ def check_earnings_blackout(symbol: str, blackout_days: int = None) -> Tuple[boo
             return False, None
 
         earnings_date_str = earnings["next_earnings_date"][:10]
-        earnings_date = datetime.strptime(earnings_date_str, "%Y-%m-%d")
+        earnings_date = datetime.fromisoformat(earnings_date_str)
         days_to_earnings = (earnings_date - datetime.now()).days
 
         if 0 <= days_to_earnings <= blackout_days:
@@ -857,41 +961,77 @@ def check_earnings_blackout(symbol: str, blackout_days: int = None) -> Tuple[boo
     return False, None
 
 
-def get_options_positions() -> List[OptionsPosition]:
-    """Get all current options positions"""
+@_ttl_cache(SNAPSHOT_TTL_SECONDS)
+def _fetch_options_positions() -> List[OptionsPosition]:
+    """Fetch all current options positions; API errors propagate so they aren't cached"""
     client = get_trading_client()
+    positions = client.get_all_positions()
+    options_positions = []
+
+    for p in positions:
+        # Check if this is an options position by looking at asset class
+        # (AssetClass is a str enum, so a raw 'us_option' compares equal too)
+        if getattr(p, 'asset_class', None) == AssetClass.US_OPTION:
+            # Parse contract symbol to extract details
+            contract_info = parse_contract_symbol(p.symbol)
+
+            options_positions.append(OptionsPosition(
+                symbol=contract_info.get('underlying', p.symbol[:4]),
+                contract_symbol=p.symbol,
+                option_type=contract_info.get('option_type', 'call'),
+                strike=contract_info.get('strike', 0),
+                expiration=contract_info.get('expiration', ''),
+                quantity=int(float(p.qty)),
+                avg_entry_price=float(p.avg_entry_price),
+                current_price=float(p.current_price),
+                market_value=float(p.market_value),
+                unrealized_pl=float(p.unrealized_pl),
+                unrealized_plpc=float(p.unrealized_plpc)
+            ))
+
+    return options_positions
 
+
+def get_options_positions() -> List[OptionsPosition]:
+    """Get all current options positions (cached for SNAPSHOT_TTL_SECONDS)"""
     try:
-        positions = client.get_all_positions()
-        options_positions = []
-
-        for p in positions:
-            # Check if this is an options position by looking at asset class
-            asset_class = getattr(p, 'asset_class', None)
-            if asset_class and 'us_option' in str(asset_class).lower():
-                # Parse contract symbol to extract details
-                contract_info = parse_contract_symbol(p.symbol)
-
-                options_positions.append(OptionsPosition(
-                    symbol=contract_info.get('underlying', p.symbol[:4]),
-                    contract_symbol=p.symbol,
-                    option_type=contract_info.get('option_type', 'call'),
-                    strike=contract_info.get('strike', 0),
-                    expiration=contract_info.get('expiration', ''),
-                    quantity=int(float(p.qty)),
-                    avg_entry_price=float(p.avg_entry_price),
-                    current_price=float(p.current_price),
-                    market_value=float(p.market_value),
-                    unrealized_pl=float(p.unrealized_pl),
-                    unrealized_plpc=float(p.unrealized_plpc)
-                ))
-
-        return options_positions
+        return _fetch_options_positions()
     except Exception as e:
         print(f"Error getting options positions: {e}")
         return []
 
 
+# Derived views of the positions snapshot, rebuilt only when
+# get_options_positions returns a new snapshot
+_snapshot_views: Tuple[Optional[List[OptionsPosition]], Dict[str, OptionsPosition], float] = (None, {}, 0.0)
+
+
+def _positions_views() -> Tuple[Dict[str, OptionsPosition], float]:
+    """(positions keyed by underlying, total market value) for the current snapshot"""
+    global _snapshot_views
+    positions = get_options_positions()
+    snapshot, by_underlying, market_value = _snapshot_views
+    if snapshot is not positions:
+        by_underlying = {pos.symbol: pos for pos in positions}
+        market_value = sum(pos.market_value for pos in positions)
+        _snapshot_views = (positions, by_underlying, market_value)
+    return by_underlying, market_value
+
+
+def get_options_positions_by_underlying() -> Dict[str, OptionsPosition]:
+    """Current options positions keyed by underlying symbol (read-only)"""
+    return _positions_views()[0]
+
+
+def get_options_market_value() -> float:
+    """Total market value of current options positions"""
+    return _positions_views()[1]
+
+
+# OCC symbol: root (adjusted roots may carry a digit), YYMMDD, C/P, strike x1000
+_OCC_RE = re.compile(r"^([A-Z0-9.]{1,6})(\d{6})([CP])(\d{8})$")
+
+
 def parse_contract_symbol(contract_symbol: str) -> Dict:
     """
     Parse OCC contract symbol format.
@@ -901,31 +1041,25 @@ def parse_contract_symbol(contract_symbol: str) -> Dict:
     - Type: C or P
     - Strike: 8 digits (00175000 = $175.00)
     """
-    try:
-        # Find where the date portion starts (6 digits before C or P)
-        for i in range(len(contract_symbol)):
-            if contract_symbol[i:i+1] in ['C', 'P'] and i >= 6:
-                underlying = contract_symbol[:i-6]
-                exp_str = contract_symbol[i-6:i]
-                opt_type = 'call' if contract_symbol[i] == 'C' else 'put'
-                strike_str = contract_symbol[i+1:]
+    match = _OCC_RE.match(contract_symbol)
+    if match:
+        underlying, exp_str, type_code, strike_str = match.groups()
+        return {
+            'underlying': underlying,
+            'expiration': f"20{exp_str[:2]}-{exp_str[2:4]}-{exp_str[4:6]}",
+            'option_type': 'call' if type_code == 'C' else 'put',
+            'strike': int(strike_str) / 1000
+        }
 
-                # Parse expiration YYMMDD
-                exp_date = f"20{exp_str[:2]}-{exp_str[2:4]}-{exp_str[4:6]}"
+    return {'underlying': contract_symbol[:4], 'option_type': 'call', 'strike': 0, 'expiration': ''}
 
-                # Parse strike (8 digits, divide by 1000)
-                strike = float(strike_str) / 1000
 
-                return {
-                    'underlying': underlying,
-                    'expiration': exp_date,
-                    'option_type': opt_type,
-                    'strike': strike
-                }
-    except Exception:
-        pass
+# Contract listings change at most daily, so a fetch for the same
+# (underlying, type, strike band, DTE window) is reused for this long
+CONTRACT_CACHE_TTL_SECONDS = 300
 
-    return {'underlying': contract_symbol[:4], 'option_type': 'call', 'strike': 0, 'expiration': ''}
+_contract_cache: Dict[tuple, Tuple[float, List[Dict]]] = {}
+_contract_cache_lock = threading.Lock()
 
 
 def find_option_contract(
@@ -952,40 +1086,85 @@ def find_option_contract(
     Returns:
         Contract info dict or None
     """
-    client = get_trading_client()
-
-    min_dte = min_dte or OPTIONS_CONFIG["min_days_to_exp"]
-    max_dte = max_dte or OPTIONS_CONFIG["max_days_to_exp"]
+    min_dte = min_dte or _MIN_DTE
+    max_dte = max_dte or _MAX_DTE
 
     try:
-        # Build request
-        today = datetime.now().date()
-        exp_start = today + timedelta(days=min_dte)
-        exp_end = today + timedelta(days=max_dte)
-
-        contract_type = ContractType.CALL if option_type.lower() == 'call' else ContractType.PUT
-
-        request = GetOptionContractsRequest(
-            underlying_symbols=[underlying],
-            status='active',
-            type=contract_type,
-            expiration_date_gte=exp_start.isoformat(),
-            expiration_date_lte=exp_end.isoformat(),
-        )
+        valid_contracts = list(_fetch_contracts(underlying, option_type, target_strike, min_dte, max_dte))
+
+        if not valid_contracts:
+            return None
 
-        # Add strike filters if we have a target
+        # If we have a target strike, find closest match
         if target_strike:
-            request.strike_price_gte = str(target_strike - 1)
-            request.strike_price_lte = str(target_strike + 1)
+            valid_contracts.sort(key=lambda x: abs(x['strike'] - target_strike))
+            return dict(valid_contracts[0])
+
+        # If we have a target expiration, filter by it
+        if target_expiration:
+            exp_contracts = [c for c in valid_contracts if c['expiration'] == target_expiration]
+            if exp_contracts:
+                valid_contracts = exp_contracts
 
-        contracts = client.get_option_contracts(request)
+        # Sort by DTE (prefer 30-45 days)
+        valid_contracts.sort(key=lambda x: abs(x['dte'] - 35))
 
-        if not contracts or not contracts.option_contracts:
-            print(f"No contracts found for {underlying}")
-            return None
+        return dict(valid_contracts[0])
+
+    except Exception as e:
+        print(f"Error finding option contract: {e}")
+        return None
+
+
+def _fetch_contracts(
+    underlying: str,
+    option_type: str,
+    target_strike: Optional[float],
+    min_dte: int,
+    max_dte: int
+) -> List[Dict]:
+    """
+    Tradable contracts in the DTE window (and strike band, if given).
+
+    Cached for CONTRACT_CACHE_TTL_SECONDS, expired lazily on access; API
+    errors are raised, not cached. Callers must not mutate the list.
+    """
+    today = datetime.now().date()
+    key = (underlying, option_type, target_strike, min_dte, max_dte, today)
+
+    now = time.monotonic()
+    with _contract_cache_lock:
+        entry = _contract_cache.get(key)
+        if entry and now - entry[0] <= CONTRACT_CACHE_TTL_SECONDS:
+            return entry[1]
 
-        # Filter and sort contracts
-        valid_contracts = []
+    client = get_trading_client()
+
+    # Build request
+    exp_start = today + timedelta(days=min_dte)
+    exp_end = today + timedelta(days=max_dte)
+
+    contract_type = ContractType.CALL if option_type.lower() == 'call' else ContractType.PUT
+
+    request = GetOptionContractsRequest(
+        underlying_symbols=[underlying],
+        status='active',
+        type=contract_type,
+        expiration_date_gte=exp_start.isoformat(),
+        expiration_date_lte=exp_end.isoformat(),
+    )
+
+    # Add strike filters if we have a target
+    if target_strike:
+        request.strike_price_gte = str(target_strike - 1)
+        request.strike_price_lte = str(target_strike + 1)
+
+    contracts = client.get_option_contracts(request)
+
+    valid_contracts = []
+    if not contracts or not contracts.option_contracts:
+        print(f"No contracts found for {underlying}")
+    else:
         for c in contracts.option_contracts:
             # Check if tradable
             if not getattr(c, 'tradable', True):
@@ -1003,7 +1182,7 @@ def find_option_contract(
             # Calculate DTE
             try:
                 if isinstance(c.expiration_date, str):
-                    exp_dt = datetime.strptime(c.expiration_date, "%Y-%m-%d").date()
+                    exp_dt = date.fromisoformat(c.expiration_date)
                 else:
                     exp_dt = c.expiration_date
                 contract_info['dte'] = (exp_dt - today).days
@@ -1012,28 +1191,12 @@ def find_option_contract(
 
             valid_contracts.append(contract_info)
 
-        if not valid_contracts:
-            return None
-
-        # If we have a target strike, find closest match
-        if target_strike:
-            valid_contracts.sort(key=lambda x: abs(x['strike'] - target_strike))
-            return valid_contracts[0]
-
-        # If we have a target expiration, filter by it
-        if target_expiration:
-            exp_contracts = [c for c in valid_contracts if c['expiration'] == target_expiration]
-            if exp_contracts:
-                valid_contracts = exp_contracts
-
-        # Sort by DTE (prefer 30-45 days)
-        valid_contracts.sort(key=lambda x: abs(x['dte'] - 35))
-
-        return valid_contracts[0]
-
-    except Exception as e:
-        print(f"Error finding option contract: {e}")
-        return None
+    with _contract_cache_lock:
+        for stale in [k for k, (fetched_at, _) in _contract_cache.items()
+                      if now - fetched_at > CONTRACT_CACHE_TTL_SECONDS]:
+            del _contract_cache[stale]
+        _contract_cache[key] = (now, valid_contracts)
+    return valid_contracts
 
 
 def calculate_options_position_size(
@@ -1119,8 +1282,8 @@ def calculate_options_position_size(
     print("  [Rules] Using config-based position sizing")
 
     # Base position value from config
-    max_position_value = OPTIONS_CONFIG["max_position_value"]
-    pct_position_value = account_equity * OPTIONS_CONFIG["position_size_pct"]
+    max_position_value = _MAX_POSITION_VALUE
+    pct_position_value = account_equity * _POSITION_SIZE_PCT
 
     # Use smaller of max_position_value or percentage
     position_value = min(max_position_value, pct_position_value)
@@ -1137,18 +1300,26 @@ def calculate_options_position_size(
     contracts = int(adjusted_value / contract_cost)
 
     # Apply limits
-    contracts = max(OPTIONS_CONFIG["default_contracts"], contracts)
-    contracts = min(OPTIONS_CONFIG["max_contracts_per_trade"], contracts)
+    contracts = max(_DEFAULT_CONTRACTS, contracts)
+    contracts = min(_MAX_CONTRACTS, contracts)
 
     # Check premium limits
-    if option_price < OPTIONS_CONFIG["min_premium"] / 100:
-        print(f"  Warning: Option premium ${option_price:.2f} below minimum ${OPTIONS_CONFIG['min_premium']/100:.2f}")
-    if option_price > OPTIONS_CONFIG["max_premium"] / 100:
-        print(f"  Warning: Option premium ${option_price:.2f} above maximum ${OPTIONS_CONFIG['max_premium']/100:.2f}")
+    if option_price < _MIN_PREMIUM:
+        print(f"  Warning: Option premium ${option_price:.2f} below minimum ${_MIN_PREMIUM:.2f}")
+    if option_price > _MAX_PREMIUM:
+        print(f"  Warning: Option premium ${option_price:.2f} above maximum ${_MAX_PREMIUM:.2f}")
 
     return contracts
 
 
+# Marketable orders usually fill within a few hundred ms, so the fill check
+# starts at FILL_POLL_INITIAL_SECONDS and doubles up to FILL_POLL_MAX_SECONDS;
+# after FILL_WAIT_SECONDS the order is reported as submitted
+FILL_WAIT_SECONDS = 30
+FILL_POLL_INITIAL_SECONDS = 0.05
+FILL_POLL_MAX_SECONDS = 1.0
+
+
 def place_options_order(
     contract_symbol: str,
     quantity: int,
@@ -1194,13 +1365,12 @@ def place_options_order(
 
         order = client.submit_order(order_request)
 
-        # Wait for fill
-        import time
-        max_wait = 30
-        elapsed = 0
+        # Wait for fill, polling fast at first and backing off
+        deadline = time.monotonic() + FILL_WAIT_SECONDS
+        delay = FILL_POLL_INITIAL_SECONDS
         fill_price = None
 
-        while elapsed < max_wait:
+        while True:
             order_status = client.get_order_by_id(order.id)
             if order_status.status == OrderStatus.FILLED:
                 fill_price = float(order_status.filled_avg_price or 0)
@@ -1211,8 +1381,13 @@ def place_options_order(
                     "error": f"Order {order_status.status.value}",
                     "order_id": str(order.id)
                 }
-            time.sleep(0.5)
-            elapsed += 0.5
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(delay)
+            delay = min(delay * 2, FILL_POLL_MAX_SECONDS)
+
+        # Positions and cash changed (or will once the order fills)
+        clear_snapshot_cache()
 
         return {
             "success": True,
@@ -1226,6 +1401,7 @@ def place_options_order(
 
     except Exception as e:
         print(f"Error placing options order: {e}")
+        clear_snapshot_cache()
         return {
             "success": False,
             "error": str(e)
@@ -1273,31 +1449,30 @@ def execute_flow_trade(enriched_signal) -> Dict:
 
     # Check position limits
     current_positions = get_options_positions()
-    if len(current_positions) >= OPTIONS_CONFIG["max_options_positions"]:
+    if len(current_positions) >= _MAX_POSITIONS:
         return {
             "success": False,
-            "error": f"Max options positions ({OPTIONS_CONFIG['max_options_positions']}) reached"
+            "error": f"Max options positions ({_MAX_POSITIONS}) reached"
         }
 
     # Check if already have position in this underlying (redundant with can_add_position but explicit)
-    for pos in current_positions:
-        if pos.symbol == signal.symbol:
-            return {
-                "success": False,
-                "error": f"Already have options position in {signal.symbol}"
-            }
+    if signal.symbol in get_options_positions_by_underlying():
+        return {
+            "success": False,
+            "error": f"Already have options position in {signal.symbol}"
+        }
 
     # Get account info
     account = get_account_info()
 
     # Check portfolio options exposure
-    options_value = sum(pos.market_value for pos in current_positions)
-    max_options_exposure = account["equity"] * OPTIONS_CONFIG["max_portfolio_risk_options"]
+    options_value = get_options_market_value()
+    max_options_exposure = account["equity"] * _MAX_OPTIONS_PCT
 
     if options_value >= max_options_exposure:
         return {
             "success": False,
-            "error": f"Max options exposure ({OPTIONS_CONFIG['max_portfolio_risk_options']*100:.0f}%) reached"
+            "error": f"Max options exposure ({_MAX_OPTIONS_PCT*100:.0f}%) reached"
         }
 
     # Find the contract
@@ -1307,8 +1482,8 @@ def execute_flow_trade(enriched_signal) -> Dict:
         option_type=signal.option_type,
         target_strike=signal.strike,
         target_expiration=signal.expiration[:10] if signal.expiration else None,
-        min_dte=OPTIONS_CONFIG["min_days_to_exp"],
-        max_dte=OPTIONS_CONFIG["max_days_to_exp"]
+        min_dte=_MIN_DTE,
+        max_dte=_MAX_DTE
     )
 
     if not contract:
@@ -1382,7 +1557,7 @@ def execute_flow_trade(enriched_signal) -> Dict:
             underlying_price = (float(q.bid_price) + float(q.ask_price)) / 2
 
         # Calculate DTE
-        exp_date = datetime.strptime(contract['expiration'], "%Y-%m-%d")
+        exp_date = datetime.fromisoformat(contract['expiration'])
         dte = max(1, (exp_date - datetime.now()).days)
 
         # Get Greeks
@@ -1393,6 +1568,7 @@ def execute_flow_trade(enriched_signal) -> Dict:
         print(f"  Warning: Could not calculate entry Greeks: {e}")
 
     # Log to database with Greeks
+    db_id = getattr(signal, 'db_id', None)
     try:
         trade_id = log_options_trade(
             contract_symbol=contract['symbol'],
@@ -1412,15 +1588,15 @@ def execute_flow_trade(enriched_signal) -> Dict:
                 'score_breakdown': signal.score_breakdown
             }),
             thesis=enriched_signal.thesis,
-            flow_signal_id=getattr(signal, 'db_id', None),
+            flow_signal_id=db_id,
             entry_greeks=entry_greeks,
             underlying_price=underlying_price,
             dte=dte,
         )
 
         # Mark signal as executed if we have the ID
-        if hasattr(signal, 'db_id') and signal.db_id:
-            mark_flow_signal_executed(signal.db_id)
+        if db_id:
+            mark_flow_signal_executed(db_id)
 
     except Exception as e:
         print(f"  Warning: Could not log trade to database: {e}")
@@ -1446,7 +1622,8 @@ def execute_flow_trade(enriched_signal) -> Dict:
 def close_options_position(
     contract_symbol: str,
     reason: str = "manual",
-    quantity: int = None
+    quantity: int = None,
+    underlying_price: float = None
 ) -> Dict:
     """
     Close an options position with Greeks logging.
@@ -1455,6 +1632,7 @@ def close_options_position(
         contract_symbol: Full OCC contract symbol
         reason: Exit reason for logging
         quantity: Number of contracts to close (default: all)
+        underlying_price: Underlying mid for the exit Greeks (fetched if not provided)
 
     Returns:
         Close result dict
@@ -1481,25 +1659,17 @@ def close_options_position(
 
         # Get exit Greeks before closing
         exit_greeks = None
-        underlying_price = None
         dte = None
         try:
             contract_info = parse_contract_symbol(contract_symbol)
 
             # Get underlying price
-            from alpaca.data.historical.stock import StockHistoricalDataClient
-            from alpaca.data.requests import StockLatestQuoteRequest
-
-            stock_client = StockHistoricalDataClient(ALPACA_API_KEY, ALPACA_SECRET_KEY)
-            quote_request = StockLatestQuoteRequest(symbol_or_symbols=[contract_info['underlying']])
-            quotes = stock_client.get_stock_latest_quote(quote_request)
-            if contract_info['underlying'] in quotes:
-                q = quotes[contract_info['underlying']]
-                underlying_price = (float(q.bid_price) + float(q.ask_price)) / 2
+            if underlying_price is None:
+                underlying_price = get_underlying_prices([contract_info['underlying']]).get(contract_info['underlying'])
 
             # Calculate DTE
             if contract_info.get('expiration'):
-                exp_date = datetime.strptime(contract_info['expiration'], "%Y-%m-%d")
+                exp_date = datetime.fromisoformat(contract_info['expiration'])
                 dte = max(0, (exp_date - datetime.now()).days)
 
             # Get Greeks
@@ -1628,60 +1798,124 @@ def close_options_position(
         }
 
 
-def check_options_exits() -> List[Dict]:
+# Concurrent close orders in check_options_exits
+EXIT_CLOSE_WORKERS = 8
+
+
+def _exit_candidates(positions: List[OptionsPosition]) -> List[Tuple[OptionsPosition, str]]:
     """
-    Check all options positions for profit target or stop loss.
+    Positions to close and why: profit target, stop loss, or <= 3 DTE.
 
-    Returns:
-        List of exit results
+    The checks run as NumPy masks over the whole snapshot; only flagged
+    positions are visited to build the reason (near-expiration wins over
+    P/L, as before).
     """
-    positions = get_options_positions()
-    results = []
+    if not positions:
+        return []
 
-    profit_target = OPTIONS_CONFIG["profit_target_pct"]
-    stop_loss = OPTIONS_CONFIG["stop_loss_pct"]
+    profit_target = _PROFIT_TARGET_PCT
+    stop_loss = _STOP_LOSS_PCT
 
-    for pos in positions:
-        pnl_pct = pos.unrealized_plpc
+    plpc = np.fromiter((pos.unrealized_plpc for pos in positions), dtype=np.float64, count=len(positions))
+    expiration = _expiration_days([pos.expiration for pos in positions])
+    dte = (expiration - np.datetime64(date.today(), "D")).astype(np.int64)
 
-        should_exit = False
+    profit_mask = plpc >= profit_target
+    loss_mask = ~profit_mask & (plpc <= -stop_loss)
+    dte_mask = ~np.isnat(expiration) & (dte <= 3)
+
+    candidates = []
+    for i in np.flatnonzero(profit_mask | loss_mask | dte_mask):
+        pos = positions[i]
+        pnl_pct = pos.unrealized_plpc
         reason = None
 
-        # Check profit target
-        if pnl_pct >= profit_target:
-            should_exit = True
+        if profit_mask[i]:
             reason = f"profit_target_{pnl_pct*100:.0f}pct"
             print(f"  {pos.contract_symbol}: Hit profit target ({pnl_pct*100:.1f}% >= {profit_target*100:.0f}%)")
-
-        # Check stop loss
-        elif pnl_pct <= -stop_loss:
-            should_exit = True
+        elif loss_mask[i]:
             reason = f"stop_loss_{abs(pnl_pct)*100:.0f}pct"
             print(f"  {pos.contract_symbol}: Hit stop loss ({pnl_pct*100:.1f}% <= -{stop_loss*100:.0f}%)")
 
-        # Check DTE (close if < 3 days)
-        if pos.expiration:
+        if dte_mask[i]:
+            reason = f"expiration_close_dte_{dte[i]}"
+            print(f"  {pos.contract_symbol}: Close to expiration ({dte[i]} DTE)")
+
+        candidates.append((pos, reason))
+    return candidates
+
+
+def _expiration_days(expirations: List[str]) -> np.ndarray:
+    """YYYY-MM-DD expirations as datetime64[D]; missing or unparseable ones are NaT"""
+    try:
+        return np.array(expirations, dtype="datetime64[D]")
+    except ValueError:
+        days = []
+        for expiration in expirations:
             try:
-                exp_date = datetime.strptime(pos.expiration, "%Y-%m-%d").date()
-                dte = (exp_date - datetime.now().date()).days
-                if dte <= 3:
-                    should_exit = True
-                    reason = f"expiration_close_dte_{dte}"
-                    print(f"  {pos.contract_symbol}: Close to expiration ({dte} DTE)")
-            except Exception:
-                pass
+                days.append(np.datetime64(date.fromisoformat(expiration), "D"))
+            except (TypeError, ValueError):
+                days.append(np.datetime64("NaT"))
+        return np.array(days, dtype="datetime64[D]")
 
-        if should_exit:
-            result = close_options_position(pos.contract_symbol, reason=reason)
-            result['position'] = {
-                'symbol': pos.symbol,
-                'contract_symbol': pos.contract_symbol,
-                'unrealized_pl': pos.unrealized_pl,
-                'unrealized_plpc': pos.unrealized_plpc
-            }
-            results.append(result)
 
-    return results
+def get_underlying_prices(symbols: List[str]) -> Dict[str, float]:
+    """
+    Latest mid price for each underlying, fetched in one quote request.
+
+    Raises on API errors; symbols without a quote are left out.
+    """
+    from alpaca.data.historical.stock import StockHistoricalDataClient
+    from alpaca.data.requests import StockLatestQuoteRequest
+
+    stock_client = StockHistoricalDataClient(ALPACA_API_KEY, ALPACA_SECRET_KEY)
+    quote_request = StockLatestQuoteRequest(symbol_or_symbols=sorted(set(symbols)))
+    quotes = stock_client.get_stock_latest_quote(quote_request)
+    return {
+        symbol: (float(q.bid_price) + float(q.ask_price)) / 2
+        for symbol, q in quotes.items()
+    }
+
+
+def _close_for_exit(pos: OptionsPosition, reason: str, underlying_price: float = None) -> Dict:
+    """Close one position flagged by _exit_candidates and attach its snapshot"""
+    result = close_options_position(pos.contract_symbol, reason=reason, underlying_price=underlying_price)
+    result['position'] = {
+        'symbol': pos.symbol,
+        'contract_symbol': pos.contract_symbol,
+        'unrealized_pl': pos.unrealized_pl,
+        'unrealized_plpc': pos.unrealized_plpc
+    }
+    return result
+
+
+def check_options_exits() -> List[Dict]:
+    """
+    Check all options positions for profit target or stop loss.
+
+    Returns:
+        List of exit results
+    """
+    to_close = _exit_candidates(get_options_positions())
+    if not to_close:
+        return []
+
+    # One quote request covers every underlying being closed (e.g. a batch
+    # of same-day expirations) instead of one per close
+    underlying_prices = {}
+    if len(to_close) > 1:
+        try:
+            underlying_prices = get_underlying_prices([pos.symbol for pos, _ in to_close])
+        except Exception as e:
+            print(f"  Warning: Could not fetch underlying quotes: {e}")
+
+    # Each close is independent network/DB I/O (quote, cancel, order, fill
+    # wait), so the positions are closed concurrently
+    with ThreadPoolExecutor(max_workers=min(EXIT_CLOSE_WORKERS, len(to_close))) as executor:
+        return list(executor.map(
+            lambda item: _close_for_exit(*item, underlying_prices.get(item[0].symbol)),
+            to_close
+        ))
 
 
 def get_options_summary() -> Dict:
@@ -1782,7 +2016,7 @@ def review_options_positions(use_agent: bool = True) -> List[Dict]:
             # Calculate DTE
             dte = 30  # Default
             if pos.expiration:
-                exp_date = datetime.strptime(pos.expiration, "%Y-%m-%d")
+                exp_date = datetime.fromisoformat(pos.expiration)
                 dte = max(0, (exp_date - datetime.now()).days)
 
             # Get Greeks
@@ -1863,7 +2097,7 @@ def review_options_portfolio(use_agent: bool = True) -> Dict:
         try:
             dte = 30
             if pos.expiration:
-                exp_date = datetime.strptime(pos.expiration, "%Y-%m-%d")
+                exp_date = datetime.fromisoformat(pos.expiration)
                 dte = max(0, (exp_date - datetime.now()).days)
                 if dte <= 7:
                     positions_expiring_soon += 1